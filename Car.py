@@ -1,13 +1,24 @@
 import pygame
 import math
+from render_cache import SpriteCache, TextCache
 
 # Initialize Pygame
 pygame.init()
 screen = pygame.display.set_mode((800, 600))
 pygame.display.set_caption("Rectangular Vehicle Control")
 clock = pygame.time.Clock()
+font = pygame.font.SysFont("consolas", 16)
+text = TextCache(font)
+
+# Vehicle body is rendered once, rotations quantized to 1 degree
+sprites = SpriteCache(angle_buckets=360)
 
 class Vehicle:
+    # Body geometry (part of the sprite cache key)
+    BODY_COLOR = (0, 0, 255)
+    BODY_SIZE = (80, 30)
+    HEAD_SIZE = (25, 20)
+
     def __init__(self, x, y, angle=0):
         self.x = x
         self.y = y
@@ -37,15 +48,18 @@ class Vehicle:
         self.x += self.speed * math.cos(rad)
         self.y += self.speed * math.sin(rad)
 
-    def draw(self, surface):
-     body_width, body_height = 80, 30
-     head_width, head_height = 25, 20
+    def sprite_key(self):
+        return (self.BODY_COLOR, self.BODY_SIZE, self.HEAD_SIZE)
+
+    def build_body(self):
+     body_width, body_height = self.BODY_SIZE
+     head_width, head_height = self.HEAD_SIZE
 
      # Create vehicle surface (transparent)
      body_surf = pygame.Surface((body_width, body_height), pygame.SRCALPHA)
      
      # Main body (blue)
-     pygame.draw.rect(body_surf, (0, 0, 255), (0, 0, body_width, body_height))
+     pygame.draw.rect(body_surf, self.BODY_COLOR, (0, 0, body_width, body_height))
      pygame.draw.rect(body_surf, (0, 0, 0), (0, 0, body_width, body_height), 2)
 
      # Front (green rectangle)
@@ -61,57 +75,21 @@ class Vehicle:
 
      # Backside (black line)
      pygame.draw.line(body_surf, (0, 0, 0), (0, 0), (0, body_height), 4)
+     return body_surf
 
-     # Rotate vehicle
-     rotated = pygame.transform.rotate(body_surf, -math.degrees(self.heading))
-     rect = rotated.get_rect(center=(self.x, self.y))
-     surface.blit(rotated, rect)
+    def draw(self, surface):
+     # Cached sprite: one blit per frame (heading matches the movement direction)
+     heading = math.radians(-self.angle)
+     sprites.blit(surface, self.sprite_key(), self.build_body, heading, (self.x, self.y))
 
      # Optional debug info
-     surface.blit(font.render(f"Pos=({int(self.x)}, {int(self.y)})", True, (0, 0, 0)), (10, 10))
-     surface.blit(font.render(f"Heading={round(math.degrees(self.heading))}°", True, (0, 0, 0)), (10, 30))
-
-     body_width, body_height = 80, 30
-     head_width, head_height = 25, 20
-
-          # Create vehicle surface (transparent)
-     body_surf = pygame.Surface((body_width, body_height), pygame.SRCALPHA)
-          
-          # Main body (blue)
-     pygame.draw.rect(body_surf, (0, 0, 255), (0, 0, body_width, body_height))
-     pygame.draw.rect(body_surf, (0, 0, 0), (0, 0, body_width, body_height), 2)
+     text.blit_glyphs(surface, f"Pos=({int(self.x)}, {int(self.y)})", (0, 0, 0), (10, 10))
+     text.blit_glyphs(surface, f"Heading={round(self.angle)}°", (0, 0, 0), (10, 30))
 
-          # Front (green rectangle)
-     pygame.draw.rect(
-               body_surf,
-               (0, 255, 0),
-               (body_width - head_width-40, (body_height - head_height)//2, head_width, head_height)
-          )
-     pygame.draw.rect(
-               body_surf,
-               (0, 0, 0),
-               (body_width - head_width-40, (body_height - head_height)//2, head_width, head_height),
-               2
-          )
-
-          # Backside (black line)
-     pygame.draw.line(
-               body_surf,
-               (0, 0, 0),
-               (0, 0),
-               (0, body_height),
-               4
-          )
-
-          # Rotate vehicle
-     rotated = pygame.transform.rotate(body_surf, -self.angle)
-     rect = rotated.get_rect(center=(self.x, self.y))
-     surface.blit(rotated, rect)
-
-          # Direction arrow
+     # Direction arrow
      arrow_length = 50
-     end_x = self.x + arrow_length * math.cos(math.radians(-self.angle))
-     end_y = self.y + arrow_length * math.sin(math.radians(-self.angle))
+     end_x = self.x + arrow_length * math.cos(heading)
+     end_y = self.y + arrow_length * math.sin(heading)
      pygame.draw.line(surface, (0, 0, 0), (self.x, self.y), (end_x, end_y), 3)
      pygame.draw.circle(surface, (0, 0, 0), (int(end_x), int(end_y)), 4)
 
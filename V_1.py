@@ -1,27 +1,41 @@
-import pygame
 import math
 import random
-
-pygame.init()
+from lazy_pygame import pygame
+from obstacles import Circle, first_hit
+from render_cache import labels
+from sim_core import Agent, light_points, register_model, run_scenario
 
 
 WIDTH, HEIGHT = 600, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Vehicle with Movable Lights")
 
+# Lights are avoided like round obstacles of this radius
+LIGHT_RADIUS = 20
 
-clock = pygame.time.Clock()
-fps = 60
-font = pygame.font.SysFont("consolas", 16)
+# Steering: look this many ticks ahead, probe headings this far apart on
+# alternating sides (nearest turn first), turn at most this much per tick
+LOOKAHEAD = 12
+PROBE_STEP = math.pi / 16
+MAX_TURN = 0.25
 
 
+class Wanderer(Agent):
+    # Body geometry (part of the sprite cache key)
+    BODY_COLOR = (0, 0, 255)
+    BODY_SIZE = (80, 30)
+    HEAD_SIZE = (25, 20)
+    STATE = Agent.STATE + ("vx", "vy", "accelerating", "accel_timer", "turn_timer")
 
-class VehicleTwo:
-    def __init__(self, x, y, radius=20, heading=0):
-        self.x = x
-        self.y = y
+    def __init__(self, x, y, radius=20, heading=0, rng=random, bounds=(WIDTH, HEIGHT),
+                 obstacles=None, info=True):
+        super().__init__(x, y, self.BODY_COLOR, rng, bounds, heading if heading else None)
         self.radius = radius
-        self.heading = heading if heading else random.uniform(0, 2 * math.pi)
+        # Static ObstacleField (None: lights only)
+        self.obstacles = obstacles
+        # Draw the speed / heading readout
+        self.info = info
+        # Candidates the next move is tested against (empty when steering
+        # found the look-ahead clear)
+        self.blocking = ()
         self.speed = 2
         self.max_speed = 6
         self.turn_speed = 0.05
@@ -35,10 +49,10 @@ class VehicleTwo:
         # Make small random turns occasionally
         self.turn_timer -= 1
         if self.turn_timer <= 0:
-            self.heading += random.uniform(-0.5, 0.5)
-            self.turn_timer = random.randint(30, 120)
+            self.heading += self.rng.uniform(-0.5, 0.5)
+            self.turn_timer = self.rng.randint(30, 120)
 
-    def update(self, light_positions):
+    def steer(self, lights, cutoff=None):
         # Random direction changes
         self._random_turn()
 
@@ -51,46 +65,77 @@ class VehicleTwo:
         else:
             current_speed = self.speed
 
-        # Compute velocity
+        # Steer toward a free direction; move() goes up to the first contact
+        candidates = self._nearby(lights, current_speed * LOOKAHEAD + self.radius)
+        self.heading, clear = self._steer(candidates, current_speed * LOOKAHEAD)
         self.vx = math.cos(self.heading) * current_speed
         self.vy = math.sin(self.heading) * current_speed
+        self.blocking = () if clear else candidates
 
-        # Predict next position
-        next_x = self.x + self.vx
-        next_y = self.y + self.vy
-
-        # Avoid lights (don't cross)
-        safe = True
-        for lx, ly in light_positions:
-            dist = math.hypot(next_x - lx, next_y - ly)
-            if dist < (self.radius + 20):  # 20 = light radius
-                safe = False
-                break
-
-        # Update position if safe
-        if safe:
-            self.x, self.y = next_x, next_y
-        else:
-            # Turn slightly away from lights
-            self.heading += random.uniform(-1, 1)
+    def move(self):
+        t = None
+        if self.blocking:
+            t, _ = first_hit(self.blocking, self.x, self.y, self.vx, self.vy, self.radius)
+        if t is None:
+            t = 1
+        self.x += self.vx * t
+        self.y += self.vy * t
 
         # Wrap around screen edges
-        self.x %= WIDTH
-        self.y %= HEIGHT
+        self.x %= self.width
+        self.y %= self.height
+
+    def _nearby(self, lights, reach):
+        # Obstacles and lights that a move of up to `reach` could touch
+        candidates = [(Circle(lx, ly, LIGHT_RADIUS), 0, 0) for lx, ly in light_points(lights)]
+        if self.obstacles is not None:
+            candidates += self.obstacles.nearby(self.x, self.y, reach)
+        return candidates
+
+    def _steer(self, candidates, distance):
+        # Smallest turn whose look-ahead sweep is clear, first toward the side
+        # away from what blocks straight ahead; when every probe is blocked,
+        # the one that gets furthest. Returns (heading, clear): clear when the
+        # look-ahead along the returned heading, so also this tick, is free
+        best, best_t = self.heading, -1
+        side = 1
+        for k in range(int(math.pi / PROBE_STEP) * 2 + 1):
+            turn = (k + 1) // 2 * PROBE_STEP * (side if k % 2 else -side)
+            heading = self.heading + turn
+            t, hit = first_hit(candidates, self.x, self.y, math.cos(heading) * distance,
+                               math.sin(heading) * distance, self.radius)
+            if t is None:
+                best, best_t = heading, None
+                break
+            if k == 0:
+                # Obstacle to the left of the heading: try right turns first
+                obstacle, sx, sy = hit
+                cross = (math.cos(heading) * (obstacle.y - self.y - sy)
+                         - math.sin(heading) * (obstacle.x - self.x - sx))
+                side = -1 if cross > 0 else 1
+            if t > best_t:
+                best, best_t = heading, t
+        turn = best - self.heading
+        if abs(turn) > MAX_TURN:
+            return self.heading + math.copysign(MAX_TURN, turn), False
+        return best, best_t is None
 
     def accelerate(self, duration=60):
         self.accelerating = True
         self.accel_timer = duration
 
-    def draw(self, surface):
-        body_width, body_height = 80, 30
-        head_width, head_height = 25, 20
+    def sprite_key(self):
+        return (self.BODY_COLOR, self.BODY_SIZE, self.HEAD_SIZE)
+
+    def build_body(self):
+        body_width, body_height = self.BODY_SIZE
+        head_width, head_height = self.HEAD_SIZE
 
         # Create body surface
         body_surf = pygame.Surface((body_width, body_height), pygame.SRCALPHA)
 
         # Main body (blue)
-        pygame.draw.rect(body_surf, (0, 0, 255), (0, 0, body_width, body_height))
+        pygame.draw.rect(body_surf, self.BODY_COLOR, (0, 0, body_width, body_height))
         pygame.draw.rect(body_surf, (0, 0, 0), (0, 0, body_width, body_height), 2)
 
         # Front (green)
@@ -107,74 +152,34 @@ class VehicleTwo:
         # Backside
         pygame.draw.line(body_surf, (0, 0, 0), (0, 0), (0, body_height), 4)
 
-        # Rotate and draw
-        rotated = pygame.transform.rotate(body_surf, -math.degrees(self.heading))
-        rect = rotated.get_rect(center=(self.x, self.y))
-        surface.blit(rotated, rect)
+        return body_surf
+
+    def draw_info(self, surface, x, y):
+        if not self.info:
+            return []
 
         # Debug info
-        surface.blit(
-            font.render(f"Speed={self.max_speed if self.accelerating else self.speed}", True, (0, 0, 0)),
+        text = labels()
+        speed = text.blit_glyphs(
+            surface, f"Speed={self.max_speed if self.accelerating else self.speed}", (0, 0, 0),
             (10, 10),
         )
-        surface.blit(
-            font.render(f"Heading={round(math.degrees(self.heading))}°", True, (0, 0, 0)),
+        heading = text.blit_glyphs(
+            surface, f"Heading={round(math.degrees(self.heading))}°", (0, 0, 0),
             (10, 30),
         )
+        return [speed, heading]
 
 
 # ==========================
-# Light class
+# Model: wanderer that steers around lights and obstacles
 # ==========================
-class Light:
-    def __init__(self, x, y, radius=15):
-        self.x = x
-        self.y = y
-        self.radius = radius
-
-    def pos(self):
-        return (self.x, self.y)
-
-    def move_light(self, new_pos):
-        self.x, self.y = new_pos
-
-    def draw(self, surface):
-        pygame.draw.circle(surface, (255, 255, 0), (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(surface, (0, 0, 0), (int(self.x), int(self.y)), self.radius, 2)
-
-
-
-vehicle = VehicleTwo(WIDTH // 2, HEIGHT // 2)
-lights = [
-    Light(WIDTH // 3, HEIGHT // 2),
-    Light(WIDTH * 2 // 3, HEIGHT // 2),
-]
-
-
-running = True
-while running:
-    screen.fill((255, 255, 255))
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            # Move the nearest light instead of adding a new one
-            mouse_pos = event.pos
-            nearest_light = min(lights, key=lambda l: (l.x - mouse_pos[0]) ** 2 + (l.y - mouse_pos[1]) ** 2)
-            nearest_light.move_light(mouse_pos)
-            vehicle.accelerate(60)  # Boost for 1 second
-
-    # Draw lights
-    for light in lights:
-        light.draw(screen)
-
-    # Update and draw vehicle
-    vehicle.update([l.pos() for l in lights])
-    vehicle.draw(screen)
+@register_model("wanderer")
+def wanderer(sim, x, y, color):
+    # Only the first wanderer shows the speed / heading readout
+    info = not any(isinstance(v, Wanderer) for v in sim.vehicles)
+    return Wanderer(x, y, rng=sim.rng, bounds=(sim.width, sim.height), obstacles=sim.obstacles, info=info)
 
-    pygame.display.flip()
-    clock.tick(fps)
 
-pygame.quit()
+if __name__ == "__main__":
+    run_scenario("v_1")
@@ -0,0 +1,209 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+from lazy_pygame import pygame
+from sim_core import SCENARIOS, Simulation
+from swarm import BEHAVIORS
+
+# Behavior mixes: registry models each mix spreads its agents over
+MIXES = {
+    "v_4": {"all": BEHAVIORS, **{b: (b,) for b in BEHAVIORS}},
+    "v_2": {"all": ("fear", "aggression"), "fear": ("fear",), "aggression": ("aggression",)},
+    "v3_t": {"all": ("memory_fear", "memory_aggression"), "fear": ("memory_fear",),
+             "aggression": ("memory_aggression",)},
+}
+# Committed results of the quick preset on this tree; --baseline without a
+# value compares against it. Refresh with:
+#   python bench.py --preset quick --out bench_baseline.json
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+PRESETS = {
+    "quick": {"agents": [10, 100, 1000], "lights": [2, 100], "mix": ["all"]},
+    "full": {"agents": [10, 100, 1000, 10000, 100000], "lights": [2, 100, 1000, 10000],
+             "mix": ["all", "love", "explorer", "figure8", "orange_dash", "fear", "aggression"]},
+}
+
+
+# -------------------------
+# Scenes: the model's scenario with `agents` vehicles and `lights` random lights
+# -------------------------
+def bench_config(model, agents, lights, mix, rng):
+    config = SCENARIOS[model]
+    width, height = config["size"]
+    models = MIXES[model][mix]
+    vehicles = []
+    for k, name in enumerate(models):
+        count = agents // len(models) + (k < agents % len(models))
+        vehicles.append({"model": name, "count": count, "x": (0, width - 1), "y": (0, height - 1),
+                         "color": (0, 100, 255)})
+    lights = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(lights)]
+    return {**config, "vehicles": vehicles, "lights": lights}
+
+
+# -------------------------
+# One case, run in its own process so peak RSS belongs to it alone
+# -------------------------
+def case_name(case):
+    return "{model}/{path}/agents={agents}/lights={lights}/mix={mix}".format(**case)
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case, min_time=0.5, max_ticks=1000, seed=0):
+    rng = random.Random(seed)
+    sim = Simulation(bench_config(case["model"], case["agents"], case["lights"], case["mix"], rng), rng)
+    surface = pygame.Surface((sim.width, sim.height))
+
+    def draw():
+        sim.draw(surface)
+
+    work = sim.step if case["path"] == "update" else draw
+
+    # One untimed tick warms caches (sprites, glyphs, grid order)
+    work()
+    ticks = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while ticks < max_ticks and elapsed < min_time:
+        work()
+        ticks += 1
+        elapsed = time.perf_counter() - start
+
+    return {
+        "name": case_name(case),
+        **case,
+        "ticks": ticks,
+        "seconds": elapsed,
+        "ticks_per_s": ticks / elapsed,
+        "ns_per_agent_tick": elapsed * 1e9 / (ticks * case["agents"]),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def cases(models, paths, agents, lights, mixes):
+    out = []
+    for model in models:
+        model_mixes = [m for m in mixes if m in MIXES[model]] or ["all"]
+        for path in paths:
+            for n in agents:
+                for l in lights:
+                    for mix in model_mixes:
+                        out.append({"model": model, "path": path, "agents": n, "lights": l, "mix": mix})
+    return out
+
+
+def run_all(case_list, min_time=0.5, max_ticks=1000, seed=0):
+    # A fresh (spawned) interpreter per case; a case that crashes or runs out of
+    # memory is recorded with its error and the rest still run
+    results = []
+    for case in case_list:
+        try:
+            with ProcessPoolExecutor(1, multiprocessing.get_context("spawn")) as pool:
+                row = pool.submit(run_case, case, min_time, max_ticks, seed).result()
+        except Exception as e:
+            row = {"name": case_name(case), **case, "error": f"{type(e).__name__}: {e}"}
+            print(f"{row['name']:<55} failed: {row['error']}", flush=True)
+        else:
+            print(f"{row['name']:<55} {row['ticks_per_s']:>10.1f} ticks/s "
+                  f"{row['ns_per_agent_tick']:>12.0f} ns/agent-tick "
+                  f"{row['peak_rss_mb'] or 0:>8.1f} MB", flush=True)
+        results.append(row)
+    return results
+
+
+# -------------------------
+# Baseline comparison
+# -------------------------
+def compare(results, baseline, threshold):
+    # Returns the cases whose ns/agent-tick grew by more than `threshold`
+    previous = {r["name"]: r for r in baseline["results"] if "error" not in r}
+    regressions = []
+    for row in results:
+        old = previous.get(row["name"])
+        if old is None:
+            continue
+        if "error" in row:
+            print(f"{row['name']:<55} REGRESSION (now fails)")
+            regressions.append((row["name"], float("inf")))
+            continue
+        ratio = row["ns_per_agent_tick"] / old["ns_per_agent_tick"]
+        flag = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{row['name']:<55} {ratio:>7.2f}x {flag}")
+        if flag:
+            regressions.append((row["name"], ratio))
+    return regressions
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark update/draw paths of the Braitenberg vehicles")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--models", nargs="+", choices=sorted(MIXES), default=sorted(MIXES))
+    parser.add_argument("--paths", nargs="+", choices=("update", "draw"), default=["update", "draw"])
+    parser.add_argument("--agents", nargs="+", type=int, help="overrides the preset")
+    parser.add_argument("--lights", nargs="+", type=int, help="overrides the preset")
+    parser.add_argument("--mix", nargs="+", help="overrides the preset")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds timed per case")
+    parser.add_argument("--max-ticks", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench.json")
+    parser.add_argument("--baseline", nargs="?", const=BASELINE,
+                        help="earlier results to compare against (no value: the committed bench_baseline.json)")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown in ns/agent-tick before a case fails")
+    args = parser.parse_args()
+
+    preset = PRESETS[args.preset]
+    case_list = cases(args.models, args.paths, args.agents or preset["agents"],
+                      args.lights or preset["lights"], args.mix or preset["mix"])
+    results = run_all(case_list, args.min_time, args.max_ticks, args.seed)
+
+    with open(args.out, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=1)
+    print(f"{len(results)} cases -> {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # Ratios across machines mean little; say where the baseline ran
+        env = baseline.get("environment", {})
+        print(f"baseline {args.baseline}: python {env.get('python')}, numpy {env.get('numpy')}, "
+              f"{env.get('platform')}, {env.get('date')}")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
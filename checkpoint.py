@@ -0,0 +1,120 @@
+import json
+import os
+import struct
+import threading
+
+import numpy as np
+
+# -------------------------
+# Checkpoint file format
+#
+#   header (little endian): magic, version, tick, directory bytes
+#   directory: JSON {"meta": {...}, "arrays": [[name, dtype, shape], ...]}
+#   data: the arrays' raw bytes, back to back in directory order
+#
+# Values are stored at full precision, so a restored run continues
+# bit for bit. Files are written next to the target and renamed over it,
+# so a run killed mid-write keeps its previous checkpoint.
+# -------------------------
+MAGIC = b"BRSTAT\x00\x01"
+VERSION = 1
+HEADER = struct.Struct("<8sIQI")
+
+
+def write(path, meta, arrays):
+    # arrays: {name: ndarray}
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    directory = json.dumps({
+        "meta": meta,
+        "arrays": [[name, a.dtype.str, a.shape] for name, a in arrays.items()],
+    }).encode()
+    partial = path + ".partial"
+    with open(partial, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, meta.get("tick", 0), len(directory)))
+        f.write(directory)
+        for a in arrays.values():
+            f.write(memoryview(a).cast("B"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+
+
+def read(path):
+    # Returns (meta, {name: ndarray})
+    with open(path, "rb") as f:
+        raw = f.read()
+    magic, version, _, size = HEADER.unpack_from(raw)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a checkpoint file")
+    offset = HEADER.size + size
+    directory = json.loads(raw[HEADER.size:offset])
+    arrays = {}
+    for name, dtype, shape in directory["arrays"]:
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        arrays[name] = np.frombuffer(raw, dtype, count, offset).reshape(shape).copy()
+        offset += count * dtype.itemsize
+    return directory["meta"], arrays
+
+
+# -------------------------
+# CheckpointWriter: saves a simulation every `every` ticks on a thread
+#
+#   save() (simulation thread) only copies the state out; encoding and
+#   the write happen on the writer thread. A save that arrives while the
+#   last one is still being written replaces any save still waiting, so
+#   a slow disk costs checkpoints, never ticks. Write errors surface on
+#   the next save() or close().
+# -------------------------
+class CheckpointWriter:
+    def __init__(self, path, every=600):
+        self.path = path
+        self.every = every
+        self.pending = None
+        self.closing = False
+        self.written = 0
+        self.superseded = 0
+        self.last_tick = None
+        self.error = None
+        self.wake = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name="checkpoint", daemon=True)
+        self.thread.start()
+
+    def tick(self, sim):
+        # Call after every step
+        if self.every and sim.tick % self.every == 0:
+            self.save(sim)
+
+    def save(self, sim):
+        if self.error is not None:
+            raise self.error
+        state = sim.state()
+        with self.wake:
+            if self.pending is not None:
+                self.superseded += 1
+            self.pending = state
+            self.wake.notify()
+
+    def close(self):
+        with self.wake:
+            self.closing = True
+            self.wake.notify()
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while True:
+            with self.wake:
+                while self.pending is None and not self.closing:
+                    self.wake.wait()
+                if self.pending is None:
+                    return
+                (meta, arrays), self.pending = self.pending, None
+            try:
+                write(self.path, meta, arrays)
+            except OSError as error:
+                self.error = error
+                return
+            self.written += 1
+            self.last_tick = meta["tick"]
@@ -0,0 +1,65 @@
+import argparse
+import time
+
+# -------------------------
+# Shared --headless command line for the Braitenberg scripts
+# -------------------------
+def run_cli(main, run_headless, description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--headless", action="store_true",
+                        help="step the simulation with no window, fonts or frame cap")
+    parser.add_argument("--ticks", type=int, default=600,
+                        help="number of ticks to simulate in headless mode")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="random seed for the initial scene")
+    parser.add_argument("--full-flip", action="store_true",
+                        help="repaint and flip the whole window every frame")
+    parser.add_argument("--render-fps", type=int, default=60,
+                        help="frame cap for drawing; physics keeps its own fixed rate")
+    parser.add_argument("--max-catch-up", type=int, default=5,
+                        help="most physics steps run in one frame before dropping time")
+    parser.add_argument("--record", metavar="PATH", default=None,
+                        help="write every physics tick to a trajectory file (see replay.py)")
+    parser.add_argument("--profile", metavar="PATH", default=None,
+                        help="start with frame timing on and dump it to PATH (.csv or .json) on exit")
+    parser.add_argument("--trace-allocs", action="store_true",
+                        help="headless: report tracemalloc allocations per tick after a warm-up")
+    parser.add_argument("--shards", type=int, default=None,
+                        help="step swarm rows in this many worker processes over shared memory")
+    parser.add_argument("--render-threads", type=int, default=None,
+                        help="draw swarm sprites in screen tiles on this many threads")
+    parser.add_argument("--async", dest="async_loop", action="store_true",
+                        help="run input, stepping, drawing and telemetry as asyncio tasks")
+    parser.add_argument("--telemetry", metavar="PATH", default=None,
+                        help="with --async: write loop stats as JSON lines to PATH")
+    parser.add_argument("--telemetry-hz", type=float, default=10,
+                        help="with --async: telemetry rate")
+    parser.add_argument("--serve", metavar="ADDRESS", default=None,
+                        help="stream every tick to local viewers on PORT, HOST:PORT or unix:PATH "
+                             "(python telemetry.py ADDRESS prints one)")
+    parser.add_argument("--checkpoint", metavar="PATH", default=None,
+                        help="save the full simulation state to PATH every --checkpoint-every ticks and on exit")
+    parser.add_argument("--checkpoint-every", type=int, default=600,
+                        help="ticks between checkpoints (0: only on exit)")
+    parser.add_argument("--restore", metavar="PATH", default=None,
+                        help="continue from a checkpoint of the same scenario (--ticks more in headless mode)")
+    args = parser.parse_args()
+
+    if not args.headless:
+        main(full_flip=args.full_flip, seed=args.seed,
+             render_fps=args.render_fps, max_catch_up=args.max_catch_up,
+             record=args.record, profile=args.profile, shards=args.shards,
+             render_threads=args.render_threads, async_loop=args.async_loop,
+             telemetry=args.telemetry, telemetry_hz=args.telemetry_hz, serve=args.serve,
+             checkpoint=args.checkpoint, checkpoint_every=args.checkpoint_every, restore=args.restore)
+        return
+
+    start = time.perf_counter()
+    vehicles = run_headless(args.ticks, args.seed, record=args.record, trace_allocs=args.trace_allocs,
+                            shards=args.shards, serve=args.serve, checkpoint=args.checkpoint,
+                            checkpoint_every=args.checkpoint_every, restore=args.restore)
+    elapsed = time.perf_counter() - start
+
+    for i, v in enumerate(vehicles):
+        print(f"{i}: x={v.x:.2f} y={v.y:.2f} heading={v.heading:.4f} speed={v.speed:.4f}")
+    print(f"{args.ticks} ticks in {elapsed:.3f}s ({args.ticks / max(elapsed, 1e-9):.0f} ticks/s)")
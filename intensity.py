@@ -0,0 +1,82 @@
+import numpy as np
+
+# -------------------------
+# Light intensity models (input: squared distance; out= computes in place)
+# -------------------------
+def clamped(d2, out=None):
+    # 5000 / max(1, d)^2 -- v_4 family
+    return np.divide(5000, np.maximum(1, d2, out=out), out=out)
+
+
+def soft(d2, out=None):
+    # 8000 / (d^2 + 1) -- v_2 / v_3 family
+    return np.divide(8000, np.add(d2, 1, out=out), out=out)
+
+
+MODELS = {"clamped": clamped, "soft": soft}
+
+# Rows per block when summing, keeps the N x M temporaries cache sized
+CHUNK = 1 << 16
+
+
+def as_points(points):
+    return np.asarray(points, dtype=float).reshape(-1, 2)
+
+
+def squared_distances(points, lights):
+    points, lights = as_points(points), as_points(lights)
+    dx = points[:, 0, None] - lights[:, 0]
+    dy = points[:, 1, None] - lights[:, 1]
+    return dx * dx + dy * dy
+
+
+# -------------------------
+# Batched kernel: N sensors x M lights
+# -------------------------
+def light_intensity(sensors, lights, model="clamped", summed=True):
+    falloff = MODELS[model]
+    sensors, lights = as_points(sensors), as_points(lights)
+    if not summed:
+        return falloff(squared_distances(sensors, lights))
+
+    out = np.empty(len(sensors))
+    rows = max(1, CHUNK // max(1, len(lights)))
+    for start in range(0, len(sensors), rows):
+        block = sensors[start:start + rows]
+        out[start:start + rows] = falloff(squared_distances(block, lights)).sum(axis=1)
+    return out
+
+
+# -------------------------
+# Few lights: plain Python sums
+#
+#   Below SCALAR_LIGHTS lights a NumPy pass costs more in call overhead
+#   than it saves. NumPy adds fewer than 8 terms left to right, as these
+#   loops do, so the sums match light_intensity() bit for bit.
+# -------------------------
+SCALAR_LIGHTS = 8
+
+
+def clamped_scalar(d2):
+    return 5000 / max(1, d2)
+
+
+def soft_scalar(d2):
+    return 8000 / (d2 + 1)
+
+
+SCALAR_MODELS = {"clamped": clamped_scalar, "soft": soft_scalar}
+
+
+def scalar_intensity(sensors, lights, model="clamped"):
+    # sensors, lights: sequences of (x, y); returns a list of sums
+    falloff = SCALAR_MODELS[model]
+    out = []
+    for sx, sy in sensors:
+        total = 0.0
+        for lx, ly in lights:
+            dx = sx - lx
+            dy = sy - ly
+            total += falloff(dx * dx + dy * dy)
+        out.append(total)
+    return out
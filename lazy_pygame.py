@@ -0,0 +1,24 @@
+import importlib.util
+import sys
+
+# -------------------------
+# Lazy imports: the module object exists at once, its code runs on first
+# attribute access. Headless runs and sweep workers never touch pygame, so
+# they never pay for importing it (or the pkg_resources it pulls in).
+# -------------------------
+def lazy_module(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+pygame = lazy_module("pygame")
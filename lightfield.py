@@ -0,0 +1,217 @@
+import math
+import numpy as np
+from intensity import MODELS, as_points, squared_distances
+
+# Cell coordinates are packed into one int64 id: (cx + OFFSET) * STRIDE + (cy + OFFSET)
+OFFSET = 1 << 20
+STRIDE = 1 << 21
+
+
+# -------------------------
+# LightField: uniform-grid spatial index over light positions
+# -------------------------
+class LightField:
+    def __init__(self, positions=(), cell_size=64):
+        self.cell_size = cell_size
+        self.positions = as_points(positions).copy()
+        self.ids = self._cell_ids(self.positions)
+        self.dirty = True
+        self.grid = None
+        # Bumped on every add / move, so readers can cache copies
+        self.version = 0
+        # Moves made while held (a step is reading), applied on release
+        self.held = None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _cells(self, points):
+        return np.floor(points / self.cell_size).astype(np.int64)
+
+    def _cell_ids(self, points):
+        cells = self._cells(points)
+        return (cells[:, 0] + OFFSET) * STRIDE + (cells[:, 1] + OFFSET)
+
+    def attach_grid(self, grid):
+        # Sensor queries for grid.model are then answered from the grid
+        self.grid = grid
+        grid.rebuild(self.positions)
+
+    # --- Incremental updates (drag / add) ---
+    def add(self, x, y):
+        self.positions = np.vstack((self.positions, (x, y)))
+        self.ids = np.append(self.ids, self._cell_ids(self.positions[-1:]))
+        self.dirty = True
+        self.version += 1
+        if self.grid is not None:
+            self.grid.add(x, y)
+        return len(self.positions) - 1
+
+    def move(self, index, x, y):
+        if self.held is not None:
+            self.held[index] = (x, y)
+            return
+        if self.grid is not None:
+            self.grid.move(self.positions[index], (x, y))
+        self.positions[index] = (x, y)
+        self.version += 1
+        new_id = self._cell_ids(self.positions[index:index + 1])[0]
+        if new_id != self.ids[index]:
+            # Only a cell change touches the grid order
+            self.ids[index] = new_id
+            self.dirty = True
+
+    # --- Hold while a step reads the field on another thread (async loop) ---
+    def hold(self):
+        self.held = {}
+
+    def release(self):
+        held, self.held = self.held, None
+        for index, (x, y) in (held or {}).items():
+            self.move(index, x, y)
+
+    def _sort(self):
+        if self.dirty:
+            self.order = np.argsort(self.ids, kind="stable")
+            self.sorted_ids = self.ids[self.order]
+            self.dirty = False
+
+    # --- Candidate gathering over the (2 * reach + 1)^2 block around each point ---
+    def _candidates(self, points, reach=1):
+        # Returns (owner, light, per-point count); pairs are grouped by owner
+        self._sort()
+        cells = self._cells(points)
+        offsets = np.arange(-reach, reach + 1)
+        qx = cells[:, 0, None, None] + offsets[:, None]
+        qy = cells[:, 1, None, None] + offsets[None, :]
+        q = ((qx + OFFSET) * STRIDE + (qy + OFFSET)).reshape(-1)
+        start = np.searchsorted(self.sorted_ids, q, "left")
+        count = np.searchsorted(self.sorted_ids, q, "right") - start
+        first = np.repeat(start - np.cumsum(count) + count, count)
+        light = self.order[first + np.arange(count.sum())]
+        per_point = count.reshape(len(points), -1).sum(axis=1)
+        owner = np.repeat(np.arange(len(points)), per_point)
+        return owner, light, per_point
+
+    # --- Queries ---
+    def nearest(self, points):
+        points = as_points(points)
+        result = np.full(len(points), -1, dtype=np.int64)
+        if not len(self.positions) or not len(points):
+            return result
+
+        owner, light, per_point = self._candidates(points)
+        d2 = ((points[owner] - self.positions[light]) ** 2).sum(axis=1)
+        best = np.full(len(points), np.inf)
+        hit = np.flatnonzero(per_point)
+        if hit.size:
+            starts = (np.cumsum(per_point) - per_point)[hit]
+            best[hit] = np.minimum.reduceat(d2, starts)
+            # Ties resolve to the lowest light index, like argmin
+            tied = np.where(d2 == best[owner], light, len(self.positions))
+            result[hit] = np.minimum.reduceat(tied, starts)
+
+        # A hit within one cell is exact (anything outside the 3x3 block is
+        # farther than cell_size); everything else falls back to a full scan
+        unsure = np.flatnonzero(best > self.cell_size ** 2)
+        if unsure.size:
+            result[unsure] = squared_distances(points[unsure], self.positions).argmin(axis=1)
+        return result
+
+    def within(self, x, y, radius):
+        self._sort()
+        reach = math.ceil(radius / self.cell_size)
+        cx, cy = self._cells(np.array([[x, y]], dtype=float))[0]
+        found = []
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                q = (i + OFFSET) * STRIDE + (j + OFFSET)
+                start = np.searchsorted(self.sorted_ids, q, "left")
+                end = np.searchsorted(self.sorted_ids, q, "right")
+                found.append(self.order[start:end])
+        found = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        d2 = ((self.positions[found] - (x, y)) ** 2).sum(axis=1)
+        return np.sort(found[d2 <= radius * radius])
+
+    def intensity(self, points, model="clamped", cutoff=None):
+        # Returns (summed intensity, per-point error bound). With a cutoff
+        # radius, lights farther than cutoff are skipped; each skipped light
+        # contributes at most falloff(cutoff^2), which bounds the error.
+        falloff = MODELS[model]
+        points = as_points(points)
+        if self.grid is not None and self.grid.model == model:
+            # O(1) per sensor; interpolation error is not part of the bound
+            return self.grid.sample(points), np.zeros(len(points))
+        if cutoff is None or not len(self.positions):
+            d2 = squared_distances(points, self.positions)
+            return falloff(d2).sum(axis=1), np.zeros(len(points))
+
+        owner, light, _ = self._candidates(points, math.ceil(cutoff / self.cell_size))
+        d2 = ((points[owner] - self.positions[light]) ** 2).sum(axis=1)
+        keep = d2 <= cutoff * cutoff
+        owner, d2 = owner[keep], d2[keep]
+        total = np.bincount(owner, weights=falloff(d2), minlength=len(points))
+        skipped = len(self.positions) - np.bincount(owner, minlength=len(points))
+        return total, skipped * falloff(float(cutoff) ** 2)
+
+
+# -------------------------
+# IntensityGrid: precomputed intensity texture, bilinear sampling
+# -------------------------
+class IntensityGrid:
+    def __init__(self, width, height, resolution=4, model="clamped", margin=32):
+        # Samples at (x0 + j * resolution, y0 + i * resolution); the margin
+        # covers sensors that stick out past the screen edge
+        self.resolution = resolution
+        self.model = model
+        self.x0 = self.y0 = -margin
+        cols = int(math.ceil((width + 2 * margin) / resolution)) + 1
+        rows = int(math.ceil((height + 2 * margin) / resolution)) + 1
+        self.gx = (self.x0 + np.arange(cols) * resolution).astype(np.float32)
+        self.gy = (self.y0 + np.arange(rows) * resolution).astype(np.float32)
+        # Lights are summed in float64, so add / remove pairs cancel instead
+        # of drifting; sampling reads the float32 copy, refreshed on demand
+        self.total = np.zeros((rows, cols))
+        self.values = np.zeros((rows, cols), dtype=np.float32)
+        self.stale = False
+        self._scratch = np.empty_like(self.values)
+
+    def _contribution(self, x, y):
+        dx2 = (self.gx - np.float32(x)) ** 2
+        dy2 = (self.gy - np.float32(y)) ** 2
+        np.add(dy2[:, None], dx2[None, :], out=self._scratch)
+        return MODELS[self.model](self._scratch)
+
+    def rebuild(self, positions):
+        self.total.fill(0)
+        for x, y in as_points(positions):
+            self.total += self._contribution(x, y)
+        self.stale = True
+
+    # --- Incremental updates: one light in, one light out ---
+    def add(self, x, y):
+        self.total += self._contribution(x, y)
+        self.stale = True
+
+    def remove(self, x, y):
+        self.total -= self._contribution(x, y)
+        self.stale = True
+
+    def move(self, old, new):
+        self.remove(*old)
+        self.add(*new)
+
+    def sample(self, points):
+        if self.stale:
+            np.copyto(self.values, self.total, casting="same_kind")
+            self.stale = False
+        points = as_points(points)
+        rows, cols = self.values.shape
+        fx = np.clip((points[:, 0] - self.x0) / self.resolution, 0, cols - 1.001)
+        fy = np.clip((points[:, 1] - self.y0) / self.resolution, 0, rows - 1.001)
+        j, i = fx.astype(np.intp), fy.astype(np.intp)
+        tx, ty = fx - j, fy - i
+        v = self.values
+        top = v[i, j] * (1 - tx) + v[i, j + 1] * tx
+        bottom = v[i + 1, j] * (1 - tx) + v[i + 1, j + 1] * tx
+        return top * (1 - ty) + bottom * ty
@@ -0,0 +1,133 @@
+import numpy as np
+
+# Candidate pairs examined per query block
+CANDIDATES = 1 << 20
+
+# -------------------------
+# CellList: spatial hash over points on a torus (width x height, wrapping)
+#
+#   Cells are at least `radius` wide, so every pair closer than radius sits
+#   in the same or a neighboring cell, counting across the wrapped edges.
+#   Distances use the minimum image (shortest way around the torus).
+#   build() is O(N); a query costs O(queries + candidates).
+# -------------------------
+class CellList:
+    def __init__(self, width, height, radius):
+        self.width = width
+        self.height = height
+        self.radius = radius
+        self.nx = max(1, int(width // radius))
+        self.ny = max(1, int(height // radius))
+        self.cell_w = width / self.nx
+        self.cell_h = height / self.ny
+        # Neighbor cell offsets per axis; on a grid narrower than 3 cells the
+        # wrapped offsets repeat, so each cell is visited once
+        self.ox = np.unique(np.arange(-1, 2) % self.nx)
+        self.oy = np.unique(np.arange(-1, 2) % self.ny)
+        self.count = 0
+
+    def _cells(self, x, y):
+        cx = np.floor(x / self.cell_w).astype(np.int64) % self.nx
+        cy = np.floor(y / self.cell_h).astype(np.int64) % self.ny
+        return cx, cy
+
+    def build(self, x, y):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.count = len(self.x)
+        cx, cy = self._cells(self.x, self.y)
+        ids = cx * self.ny + cy
+        self.order = np.argsort(ids, kind="stable")
+        counts = np.bincount(ids, minlength=self.nx * self.ny)
+        self.starts = np.cumsum(counts) - counts
+        self.counts = counts
+        return self
+
+    def _wrap(self, d, size):
+        return (d + size / 2) % size - size / 2
+
+    def query(self, qx, qy, owner=None):
+        # Returns (query, point, dx, dy) for every point within radius of a
+        # query point; dx, dy point from the query to the point. `owner`
+        # (point index per query, or -1) excludes a query's own point.
+        qx = np.asarray(qx, dtype=float)
+        qy = np.asarray(qy, dtype=float)
+        cx, cy = self._cells(qx, qy)
+        # Cells around each query, wrapped per axis
+        ox = (cx[:, None] + self.ox) % self.nx
+        oy = (cy[:, None] + self.oy) % self.ny
+        cells = (ox[:, :, None] * self.ny + oy[:, None, :]).reshape(len(qx), -1)
+
+        start = self.starts[cells].reshape(-1)
+        count = self.counts[cells].reshape(-1)
+        total = count.sum()
+        first = np.repeat(start - np.cumsum(count) + count, count)
+        point = self.order[first + np.arange(total)]
+        query = np.repeat(np.arange(len(qx)), count.reshape(len(qx), -1).sum(axis=1))
+
+        dx = self._wrap(self.x[point] - qx[query], self.width)
+        dy = self._wrap(self.y[point] - qy[query], self.height)
+        keep = dx * dx + dy * dy <= self.radius * self.radius
+        if owner is not None:
+            keep &= point != np.asarray(owner)[query]
+        return query[keep], point[keep], dx[keep], dy[keep]
+
+    def blocks(self, queries, budget=CANDIDATES):
+        # Slices of the queries whose candidate lists stay near `budget`
+        # entries, so memory does not grow with density times count
+        per_query = len(self.ox) * len(self.oy) * self.count / (self.nx * self.ny)
+        size = max(1, int(budget // max(per_query, 1)))
+        return [slice(start, start + size) for start in range(0, queries, size)]
+
+    def iter_pairs(self, budget=CANDIDATES):
+        # Each unordered pair of built points within radius, once (i < j),
+        # a block of points at a time; dx, dy point from i to j
+        for block in self.blocks(self.count, budget):
+            i, j, dx, dy = self.query(self.x[block], self.y[block])
+            i += block.start
+            keep = i < j
+            yield i[keep], j[keep], dx[keep], dy[keep]
+
+    def pairs(self):
+        found = list(self.iter_pairs())
+        if not found:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0), np.empty(0)
+        return tuple(np.concatenate(column) for column in zip(*found))
+
+
+# -------------------------
+# Reference: all pairs, O(N^2) (small swarms and checks)
+# -------------------------
+def brute_force_pairs(x, y, width, height, radius):
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    dx = (x[None, :] - x[:, None] + width / 2) % width - width / 2
+    dy = (y[None, :] - y[:, None] + height / 2) % height - height / 2
+    i, j = np.nonzero(np.triu(dx * dx + dy * dy <= radius * radius, 1))
+    return i, j, dx[i, j], dy[i, j]
+
+
+# -------------------------
+# Check: python neighbors.py [POINTS]
+#   CellList pairs must equal the brute-force pairs on random points,
+#   including grids narrower than 3 cells and queries split into blocks
+# -------------------------
+if __name__ == "__main__":
+    import sys
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = np.random.default_rng(1)
+    width, height = 900, 650
+    x, y = rng.uniform(0, width, n), rng.uniform(0, height, n)
+    for radius in (10, 40, 250, 400):
+        expected = brute_force_pairs(x, y, width, height, radius)
+        cells = CellList(width, height, radius).build(x, y)
+        # A small budget splits the queries into many blocks
+        blocked = tuple(np.concatenate(column) for column in zip(*cells.iter_pairs(budget=5000)))
+        for label, (i, j, dx, dy) in (("pairs()", cells.pairs()), ("blocked", blocked)):
+            order = np.lexsort((j, i))
+            assert np.array_equal(i[order], expected[0]) and np.array_equal(j[order], expected[1]), \
+                f"radius {radius}, {label}: pairs differ"
+            assert np.allclose(dx[order], expected[2]) and np.allclose(dy[order], expected[3]), \
+                f"radius {radius}, {label}: offsets differ"
+        print(f"radius {radius}: {len(expected[0])} pairs, {cells.nx}x{cells.ny} cells, identical to brute force")
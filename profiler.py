@@ -0,0 +1,158 @@
+import csv
+import json
+from collections import deque
+import time
+import tracemalloc
+
+import numpy as np
+from lazy_pygame import pygame
+
+PHASES = ("events", "update", "draw", "text", "overlay", "flip", "wait")
+PERCENTILES = (50, 95, 99)
+
+
+# -------------------------
+# FrameProfiler: per-phase frame timing with rolling percentiles
+#
+#   lap(phase) charges the time since the previous lap to `phase`;
+#   end_frame() closes the row. While disabled every call returns at once.
+#   The trace keeps the last `history` frames (10 minutes at 60 fps).
+# -------------------------
+class FrameProfiler:
+    def __init__(self, phases=PHASES, window=600, enabled=False, path="profile.csv",
+                 toggle_key=None, dump_key=None, refresh=30, history=36000):
+        self.phases = tuple(phases)
+        self.index = {p: i for i, p in enumerate(self.phases)}
+        self.window = np.zeros((window, len(self.phases)), dtype=np.int64)
+        self.path = path
+        # Defaults F3 / F4; resolved here so importing needs no pygame
+        self.toggle_key = pygame.K_F3 if toggle_key is None else toggle_key
+        self.dump_key = pygame.K_F4 if dump_key is None else dump_key
+        self.refresh = refresh
+        self.frames = 0
+        self.trace = deque(maxlen=history)
+        self.lines = []
+        self.enabled = False
+        if enabled:
+            self.toggle()
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.current = [0] * len(self.phases)
+        self.last = time.perf_counter_ns()
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == self.toggle_key:
+                self.toggle()
+            elif event.key == self.dump_key and self.trace:
+                print(f"profile: {len(self.trace)} frames -> {self.dump()}")
+
+    # --- Hot path ---
+    def lap(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.current[self.index[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.window[self.frames % len(self.window)] = self.current
+        self.trace.append(self.current)
+        self.current = [0] * len(self.phases)
+        self.frames += 1
+        if self.frames % self.refresh == 0:
+            self.lines = self._format()
+
+    # --- Statistics ---
+    def percentiles(self):
+        # {phase: (p50, p95, p99)} in milliseconds over the rolling window,
+        # plus "frame" for the whole frame
+        rows = self.window[:min(self.frames, len(self.window))]
+        if not len(rows):
+            return {}
+        rows = np.column_stack((rows, rows.sum(axis=1))) / 1e6
+        values = np.percentile(rows, PERCENTILES, axis=0)
+        names = self.phases + ("frame",)
+        return {name: tuple(float(v) for v in values[:, i]) for i, name in enumerate(names)}
+
+    def _format(self):
+        lines = [f"{'phase':<8}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        for name, (p50, p95, p99) in self.percentiles().items():
+            lines.append(f"{name:<8}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+        return lines
+
+    # --- Overlay ---
+    def draw(self, surface, text, pos):
+        # Returns the dirty Rect (None when there is nothing to show)
+        if not self.enabled or not self.lines:
+            return None
+        x, y = pos
+        line_height = text.font.get_linesize()
+        width = max(text.font.size(line)[0] for line in self.lines)
+        box = pygame.Rect(x - 4, y - 4, width + 8, line_height * len(self.lines) + 8)
+        surface.fill((235, 235, 235), box)
+        for i, line in enumerate(self.lines):
+            text.blit(surface, line, (0, 0, 0), (x, y + i * line_height))
+        return box
+
+    # --- Trace export ---
+    def dump(self, path=None):
+        # The traced frames in nanoseconds; format follows the extension.
+        # Frame numbers count from the first profiled frame, also when
+        # older frames have left the trace.
+        path = path or self.path
+        first = self.frames - len(self.trace)
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"phases": self.phases, "unit": "ns", "first_frame": first, "frames": list(self.trace),
+                           "percentiles_ms": self.percentiles()}, f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(("frame",) + self.phases)
+                for i, row in enumerate(self.trace, first):
+                    writer.writerow([i] + row)
+        return path
+
+
+# -------------------------
+# AllocationTracer: tracemalloc around each tick (headless --trace-allocs)
+#
+#   The first `warmup` ticks build buffers, caches and grid order and are
+#   not traced. For every later tick it keeps the bytes still held after
+#   the tick (net) and the high-water mark above its start (transient).
+# -------------------------
+class AllocationTracer:
+    def __init__(self, warmup=10):
+        self.warmup = warmup
+        self.ticks = 0
+        self.start = 0
+        self.net = []
+        self.transient = []
+
+    def begin(self):
+        if self.ticks == self.warmup:
+            tracemalloc.start()
+        if self.ticks >= self.warmup:
+            tracemalloc.reset_peak()
+            self.start = tracemalloc.get_traced_memory()[0]
+
+    def end(self):
+        if self.ticks >= self.warmup:
+            current, peak = tracemalloc.get_traced_memory()
+            self.net.append(current - self.start)
+            self.transient.append(peak - self.start)
+        self.ticks += 1
+
+    def report(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if not self.net:
+            return f"allocations: no ticks after the {self.warmup}-tick warm-up"
+        net, transient = np.array(self.net), np.array(self.transient)
+        return (f"allocations over {len(net)} ticks after a {self.warmup}-tick warm-up: "
+                f"net {net.sum()} B total ({np.count_nonzero(net)} ticks non-zero), "
+                f"transient p50 {np.median(transient):.0f} B, max {transient.max()} B per tick")
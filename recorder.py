@@ -0,0 +1,135 @@
+import os
+import struct
+import warnings
+
+import numpy as np
+
+# -------------------------
+# Trajectory file format
+#
+#   header (HEADER_SIZE bytes, little endian):
+#       magic, version, vehicles, lights, ticks, fps, width, height, fields
+#   frames: one fixed-width float32 row per tick, columnar inside the row
+#       [field_0 x vehicles][field_1 x vehicles]...[lights x 2]
+#
+# Tick t lives at HEADER_SIZE + t * frame_bytes, so replay is O(1) per tick.
+# -------------------------
+MAGIC = b"BRTRAJ\x00\x01"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIQfff64s")
+HEADER_SIZE = 128
+DEFAULT_FIELDS = ("x", "y", "heading", "speed")
+
+
+def frame_floats(vehicles, lights, fields):
+    return len(fields) * vehicles + 2 * lights
+
+
+# -------------------------
+# Writer
+# -------------------------
+class TrajectoryWriter:
+    def __init__(self, path, vehicles, lights, fields=DEFAULT_FIELDS, fps=60, width=0, height=0):
+        # `lights` is the light capacity; unused slots are written as NaN
+        self.path = path
+        self.vehicles = vehicles
+        self.lights = lights
+        self.fields = tuple(fields)
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.ticks = 0
+        # Ticks that had more lights than slots (only the first fit)
+        self.truncated = 0
+        self.frame = np.empty(frame_floats(vehicles, lights, self.fields), dtype=np.float32)
+        self.file = open(path, "wb")
+        self._write_header()
+
+    def _write_header(self):
+        names = ",".join(self.fields).encode()
+        if len(names) > 64:
+            raise ValueError("field names do not fit in the header")
+        header = HEADER.pack(MAGIC, VERSION, self.vehicles, self.lights, self.ticks,
+                             self.fps, self.width, self.height, names)
+        self.file.seek(0)
+        self.file.write(header.ljust(HEADER_SIZE, b"\0"))
+
+    def write(self, columns, light_positions):
+        # columns: {field: sequence of one value per vehicle}
+        n = self.vehicles
+        for i, name in enumerate(self.fields):
+            self.frame[i * n:(i + 1) * n] = columns[name]
+
+        lights = np.asarray(light_positions, dtype=np.float32).reshape(-1, 2)
+        if len(lights) > self.lights:
+            # Lights added past the reserved slots are not recorded
+            if not self.truncated:
+                warnings.warn(f"{len(lights)} lights exceed the recorder capacity of {self.lights}; "
+                              f"recording the first {self.lights}")
+            self.truncated += 1
+            lights = lights[:self.lights]
+        tail = self.frame[len(self.fields) * n:].reshape(-1, 2)
+        tail[:len(lights)] = lights
+        tail[len(lights):] = np.nan
+
+        self.frame.tofile(self.file)
+        self.ticks += 1
+
+    def close(self):
+        if not self.file.closed:
+            self._write_header()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def vehicle_columns(vehicles, fields):
+    # Per-object scenes (VehicleTwo / VehicleThree)
+    return {name: [getattr(v, name) for v in vehicles] for name in fields}
+
+
+# -------------------------
+# Reader (memory-mapped, nothing is loaded up front)
+# -------------------------
+class TrajectoryReader:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            raw = f.read(HEADER_SIZE)
+        magic, version, vehicles, lights, ticks, fps, width, height, names = HEADER.unpack_from(raw)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a trajectory file")
+
+        self.vehicles = vehicles
+        self.lights = lights
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.fields = tuple(names.rstrip(b"\0").decode().split(","))
+        width_floats = frame_floats(vehicles, lights, self.fields)
+
+        # The header tick count is only final after close(); a killed run is
+        # still readable up to its last complete frame
+        complete = (os.path.getsize(path) - HEADER_SIZE) // (4 * width_floats)
+        self.ticks = complete
+        self.frames = np.memmap(path, dtype=np.float32, mode="r", offset=HEADER_SIZE,
+                                shape=(complete, width_floats))
+
+    def __len__(self):
+        return self.ticks
+
+    def column(self, name):
+        # (ticks, vehicles) strided view of one field across the whole run
+        i = self.fields.index(name)
+        return self.frames[:, i * self.vehicles:(i + 1) * self.vehicles]
+
+    def frame(self, tick):
+        row = self.frames[tick]
+        n = self.vehicles
+        out = {name: row[i * n:(i + 1) * n] for i, name in enumerate(self.fields)}
+        lights = row[len(self.fields) * n:].reshape(-1, 2)
+        out["lights"] = lights[~np.isnan(lights[:, 0])]
+        return out
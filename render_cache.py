@@ -0,0 +1,142 @@
+import json
+import math
+import os
+from collections import OrderedDict
+
+from lazy_pygame import pygame
+
+# Resolved system font files, kept between runs
+FONT_CACHE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                          "braitenberg", "fonts.json")
+
+# -------------------------
+# Sprite cache: bodies rendered once, rotations quantized + LRU
+# -------------------------
+class SpriteCache:
+    def __init__(self, angle_buckets=360, max_rotations=2048):
+        self.angle_buckets = angle_buckets
+        self.max_rotations = max_rotations
+        self.bodies = {}
+        self.rotations = OrderedDict()
+
+    def body(self, key, build):
+        # key must capture everything build() draws (color, geometry, ...)
+        surf = self.bodies.get(key)
+        if surf is None:
+            surf = self.bodies[key] = build()
+        return surf
+
+    def bucket(self, heading):
+        return round(heading / (2 * math.pi) * self.angle_buckets) % self.angle_buckets
+
+    def rotated(self, key, build, heading):
+        bucket = self.bucket(heading)
+        surf = self.rotations.get((key, bucket))
+        if surf is not None:
+            self.rotations.move_to_end((key, bucket))
+            return surf
+
+        angle = bucket * 360 / self.angle_buckets
+        surf = pygame.transform.rotate(self.body(key, build), -angle)
+        self.rotations[(key, bucket)] = surf
+        if len(self.rotations) > self.max_rotations:
+            self.rotations.popitem(last=False)
+        return surf
+
+    def blit(self, surface, key, build, heading, center):
+        rotated = self.rotated(key, build, heading)
+        return surface.blit(rotated, rotated.get_rect(center=center))
+
+
+# -------------------------
+# Text cache: static strings rendered once, numbers built from glyphs
+# -------------------------
+class TextCache:
+    def __init__(self, font, max_entries=512, antialias=True):
+        self.font = font
+        self.max_entries = max_entries
+        self.antialias = antialias
+        self.strings = OrderedDict()
+        self.glyphs = {}
+
+    def render(self, text, color=(0, 0, 0)):
+        key = (text, color)
+        surf = self.strings.get(key)
+        if surf is not None:
+            self.strings.move_to_end(key)
+            return surf
+
+        surf = self.font.render(text, self.antialias, color)
+        self.strings[key] = surf
+        if len(self.strings) > self.max_entries:
+            self.strings.popitem(last=False)
+        return surf
+
+    def glyph(self, char, color=(0, 0, 0)):
+        # One surface per (character, color); the working set is tiny, so a
+        # full reset is enough to keep it bounded
+        key = (char, color)
+        surf = self.glyphs.get(key)
+        if surf is None:
+            if len(self.glyphs) >= self.max_entries:
+                self.glyphs.clear()
+            surf = self.glyphs[key] = self.font.render(char, self.antialias, color)
+        return surf
+
+    def blit(self, surface, text, color, pos):
+        # Static labels (legends, help lines)
+        return surface.blit(self.render(text, color), pos)
+
+    def blit_glyphs(self, surface, text, color, pos):
+        # Changing labels (speed, heading, memory): no rasterization per frame
+        x, y = pos
+        for char in text:
+            glyph = self.glyph(char, color)
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return pygame.Rect(pos[0], y, x - pos[0], self.font.get_linesize())
+
+
+# -------------------------
+# System fonts: SysFont scans every installed font (fc-list on Linux) the
+# first time it is called; the file it resolves to is cached on disk
+# -------------------------
+def font_path(name, cache_path=FONT_CACHE):
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    path = cache.get(name, "")
+    if path is None or (path and os.path.exists(path)):
+        return path
+
+    # None: not installed, pygame's default font is used (as SysFont does)
+    path = cache[name] = pygame.font.match_font(name)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w") as f:
+            json.dump(cache, f, indent=1)
+    except OSError:
+        pass
+    return path
+
+
+def system_font(name, size):
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.Font(font_path(name), size)
+
+
+# -------------------------
+# Shared label cache (one font for every script's on-screen text), created
+# on first render
+# -------------------------
+_labels = None
+
+
+def labels():
+    global _labels
+    if _labels is None:
+        _labels = TextCache(system_font("consolas", 16))
+    return _labels
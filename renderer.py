@@ -0,0 +1,50 @@
+from lazy_pygame import pygame
+
+# -------------------------
+# Dirty-rectangle renderer (full fill + flip kept as fallback)
+#
+#   background is a color or a screen-sized Surface (static scenery) that
+#   erased rects are restored from.
+# -------------------------
+class DirtyRenderer:
+    def __init__(self, screen, background=(255, 255, 255), enabled=True):
+        self.screen = screen
+        self.background = background
+        self.enabled = enabled
+        self.previous = []
+        self.current = []
+        self.full_redraw = True
+
+    def begin(self):
+        if not self.enabled or self.full_redraw:
+            self._erase(self.screen.get_rect())
+            return
+        # Only erase what was drawn last frame; everything is redrawn after
+        for rect in self.previous:
+            self._erase(rect)
+
+    def _erase(self, rect):
+        if isinstance(self.background, pygame.Surface):
+            rect = pygame.Rect(rect).clip(self.screen.get_rect())
+            self.screen.blit(self.background, rect, rect)
+        else:
+            self.screen.fill(self.background, rect)
+
+    def add(self, rect):
+        # Every draw call reports the rect it touched
+        if rect is not None:
+            self.current.append(rect)
+        return rect
+
+    def end(self):
+        if not self.enabled or self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.previous + self.current)
+        self.previous = self.current
+        self.current = []
+
+    def invalidate(self):
+        # Force a full repaint next frame (window exposed, mode toggled, ...)
+        self.full_redraw = True
@@ -0,0 +1,114 @@
+import argparse
+import math
+import pygame
+from recorder import TrajectoryReader
+from render_cache import labels
+
+# Colors for recordings that carry a "behavior" column (v_4 order)
+BEHAVIOR_COLORS = [(0, 100, 255), (0, 200, 0), (200, 0, 200), (255, 165, 0)]
+# Otherwise vehicles are colored by index
+VEHICLE_COLORS = [(0, 0, 255), (255, 120, 0), (200, 0, 0), (0, 150, 0)]
+BAR_HEIGHT = 14
+
+
+# -------------------------
+# Drawing one recorded tick
+# -------------------------
+def draw_frame(screen, frame, size=8):
+    for lx, ly in frame["lights"].tolist():
+        pygame.draw.circle(screen, (255, 200, 0), (int(lx), int(ly)), 15)
+
+    behavior = frame.get("behavior")
+    for i, (x, y, h) in enumerate(zip(frame["x"].tolist(), frame["y"].tolist(), frame["heading"].tolist())):
+        if behavior is not None:
+            color = BEHAVIOR_COLORS[int(behavior[i]) % len(BEHAVIOR_COLORS)]
+        else:
+            color = VEHICLE_COLORS[i % len(VEHICLE_COLORS)]
+        pygame.draw.circle(screen, color, (int(x), int(y)), size)
+        pygame.draw.line(screen, (0, 0, 0), (x, y),
+                         (x + math.cos(h) * size * 1.5, y + math.sin(h) * size * 1.5), 2)
+
+
+def draw_bar(screen, tick, ticks):
+    w, h = screen.get_size()
+    pygame.draw.rect(screen, (220, 220, 220), (0, h - BAR_HEIGHT, w, BAR_HEIGHT))
+    done = int(w * tick / max(1, ticks - 1))
+    pygame.draw.rect(screen, (90, 90, 90), (0, h - BAR_HEIGHT, done, BAR_HEIGHT))
+
+
+# -------------------------
+# MAIN LOOP
+# -------------------------
+def main(path, speed=1):
+    reader = TrajectoryReader(path)
+    if not len(reader):
+        raise SystemExit(f"{path} has no recorded ticks")
+
+    pygame.display.init()
+    width, height = int(reader.width) or 900, int(reader.height) or 650
+    screen = pygame.display.set_mode((width, height + BAR_HEIGHT))
+    pygame.display.set_caption(f"Replay – {path}")
+    clock = pygame.time.Clock()
+    text = labels()
+
+    tick, playing, scrubbing = 0, True, False
+    last = len(reader) - 1
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                step = int(reader.fps) if event.mod & pygame.KMOD_SHIFT else 1
+                if event.key == pygame.K_SPACE:
+                    playing = not playing
+                elif event.key == pygame.K_RIGHT:
+                    tick += step
+                elif event.key == pygame.K_LEFT:
+                    tick -= step
+                elif event.key == pygame.K_HOME:
+                    tick = 0
+                elif event.key == pygame.K_END:
+                    tick = last
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS):
+                    speed *= 2
+                elif event.key == pygame.K_MINUS:
+                    speed = max(1, speed // 2)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.pos[1] >= height:
+                scrubbing = True
+            elif event.type == pygame.MOUSEBUTTONUP:
+                scrubbing = False
+
+        if scrubbing:
+            # Jumping anywhere only touches the pages of that one frame
+            tick = int(pygame.mouse.get_pos()[0] / width * last)
+        elif playing:
+            tick += speed
+        tick = max(0, min(tick, last))
+
+        screen.fill((255, 255, 255))
+        frame = reader.frame(tick)
+        draw_frame(screen, frame)
+        draw_bar(screen, tick, len(reader))
+
+        status = f"tick {tick}/{last}  x{speed}  {'playing' if playing else 'paused'}"
+        text.blit(screen, status, (0, 0, 0), (10, 10))
+        if "memory" in frame:
+            memory = "  ".join(f"{m:.2f}" for m in frame["memory"][:4])
+            text.blit(screen, f"Memory: {memory}", (0, 0, 0), (10, 30))
+        text.blit(screen, "Space: play/pause | Left/Right (+Shift): step | +/-: speed | drag bar: scrub",
+                  (0, 0, 0), (10, height - 24))
+
+        pygame.display.flip()
+        clock.tick(reader.fps)
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded Braitenberg trajectory file")
+    parser.add_argument("path", help="file written with --record")
+    parser.add_argument("--speed", type=int, default=1, help="ticks advanced per frame")
+    args = parser.parse_args()
+    main(args.path, args.speed)
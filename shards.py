@@ -0,0 +1,171 @@
+import multiprocessing as mp
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+from lightfield import LightField
+from swarm import COLUMNS, PREVIOUS, Swarm
+
+# Per-row columns kept in shared memory (float64, then the int8 behavior)
+SHARED = COLUMNS + PREVIOUS
+# Control block slots (int64)
+STOP, LIGHTS = range(2)
+# Swarm settings copied into every worker at start
+SETTINGS = ("threshold", "turn_gain", "attract_gain", "sensor_offset", "fused")
+
+
+def _views(block, capacity, lights, workers):
+    # Column arrays, the light array, the control block and one intensity
+    # error slot per worker over one buffer
+    views, offset = {}, 0
+    for name in SHARED:
+        views[name] = np.ndarray(capacity, dtype=np.float64, buffer=block.buf, offset=offset)
+        offset += capacity * 8
+    views["lights"] = np.ndarray((lights, 2), dtype=np.float64, buffer=block.buf, offset=offset)
+    offset += lights * 16
+    views["control"] = np.ndarray(2, dtype=np.int64, buffer=block.buf, offset=offset)
+    offset += 16
+    views["errors"] = np.ndarray(workers, dtype=np.float64, buffer=block.buf, offset=offset)
+    offset += workers * 8
+    views["behavior"] = np.ndarray(capacity, dtype=np.int8, buffer=block.buf, offset=offset)
+    return views
+
+
+def _size(capacity, lights, workers):
+    return capacity * (8 * len(SHARED) + 1) + lights * 16 + 16 + workers * 8
+
+
+# -------------------------
+# Worker: steps rows [lo, hi) of the shared swarm, once per barrier round
+# -------------------------
+def _work(name, capacity, light_capacity, workers, k, lo, hi, spec, cutoff, barrier):
+    block = shared_memory.SharedMemory(name=name)
+    views = _views(block, capacity, light_capacity, workers)
+    width, height, fps, cell_size, settings = spec
+    swarm = Swarm(width, height, fps)
+    for key, value in settings.items():
+        setattr(swarm, key, value)
+    for key in SHARED + ("behavior",):
+        setattr(swarm, key, views[key][lo:hi])
+    swarm.count = hi - lo
+    lights, control, errors = views["lights"], views["control"], views["errors"]
+    lights.flags.writeable = False
+
+    while True:
+        barrier.wait()
+        if control[STOP]:
+            break
+        current = lights[:control[LIGHTS]]
+        if cutoff is not None:
+            # The cutoff needs a grid over the lights, like the serial step
+            current = LightField(current, cell_size)
+        swarm.step(current, cutoff)
+        errors[k] = swarm.intensity_error
+        barrier.wait()
+    del swarm, lights, control, errors, views
+    block.close()
+
+
+# -------------------------
+# ShardPool: one Swarm stepped by worker processes over shared memory
+#
+#   Columns move into one shared block and the Swarm keeps using them, so
+#   rows, drawing and recording read the live state (add every row
+#   first). Each tick the lights are copied in, a barrier starts the
+#   workers on their row ranges and a second one waits for all of them;
+#   nothing is pickled per tick. Rows are independent without
+#   interactions (emit / repel need every row, so they are refused);
+#   tunables are copied once, at start. With a cutoff every worker grids
+#   the lights itself; the largest intensity_error comes back.
+# -------------------------
+class ShardPool:
+    def __init__(self, swarm, workers, cutoff=None, light_capacity=256, timeout=60, cell_size=64):
+        if swarm.emit_radius or swarm.repel_radius:
+            raise ValueError("sharded swarms do not support vehicle-vehicle interactions")
+        self.swarm = swarm
+        self.timeout = timeout
+        n = swarm.count
+        self.light_capacity = light_capacity
+        bounds = np.linspace(0, n, max(1, min(workers, n)) + 1).astype(int)
+        workers = len(bounds) - 1
+        self.block = shared_memory.SharedMemory(create=True, size=_size(max(n, 1), light_capacity, workers))
+        self.views = _views(self.block, max(n, 1), light_capacity, workers)
+        for key in SHARED + ("behavior",):
+            self.views[key][:n] = getattr(swarm, key)[:n]
+            setattr(swarm, key, self.views[key])
+        self.lights, self.control, self.errors = self.views["lights"], self.views["control"], self.views["errors"]
+        self.control[:] = 0
+        self.errors[:] = 0
+
+        settings = {key: getattr(swarm, key) for key in SETTINGS}
+        spec = (swarm.width, swarm.height, swarm.fps, cell_size, settings)
+        context = mp.get_context()
+        self.barrier = context.Barrier(workers + 1)
+        self.processes = [
+            context.Process(target=_work, daemon=True,
+                            args=(self.block.name, max(n, 1), light_capacity, workers, k, lo, hi, spec, cutoff,
+                                  self.barrier))
+            for k, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:]))
+        ]
+        for process in self.processes:
+            process.start()
+
+    def __len__(self):
+        return len(self.processes)
+
+    def step(self, light_positions):
+        # light_positions: (n, 2) array, e.g. LightField.positions
+        n = len(light_positions)
+        if n > self.light_capacity:
+            raise ValueError(f"sharded swarm holds at most {self.light_capacity} lights")
+        self.lights[:n] = light_positions
+        self.control[LIGHTS] = n
+        self.barrier.wait(self.timeout)
+        self.barrier.wait(self.timeout)
+        self.swarm.intensity_error = float(self.errors.max())
+
+    def close(self):
+        # Stops the workers; the Swarm gets private copies of its columns back
+        if self.block is None:
+            return
+        if not self.barrier.broken:
+            self.control[STOP] = 1
+            self.barrier.wait(self.timeout)
+        for process in self.processes:
+            process.join(self.timeout)
+            if process.is_alive():
+                process.terminate()
+        for key in SHARED + ("behavior",):
+            setattr(self.swarm, key, self.views[key].copy())
+        self.views = self.lights = self.control = self.errors = None
+        self.block.close()
+        self.block.unlink()
+        self.block = None
+
+
+# -------------------------
+# Check: python shards.py [SCENARIO] [TICKS]
+#   the same scene stepped serially and by 2 and 3 shards, with and
+#   without a cutoff, must end in the same state
+# -------------------------
+if __name__ == "__main__":
+    import random
+    import sim_core
+
+    name = sys.argv[1] if len(sys.argv) > 1 else "v_4"
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    for cutoff in (None, 100):
+        config = dict(sim_core.SCENARIOS[name], cutoff=cutoff)
+        runs = []
+        for shards in (1, 2, 3):
+            sim = sim_core.Simulation(dict(config, shards=shards), random.Random(1))
+            for _ in range(ticks):
+                sim.step()
+            sim.close()
+            n = sim.swarm.count
+            runs.append((np.column_stack([getattr(sim.swarm, key)[:n] for key in SHARED]), sim.swarm.intensity_error))
+        (serial, error), sharded = runs[0], runs[1:]
+        for shards, (state, shard_error) in zip((2, 3), sharded):
+            assert np.array_equal(state, serial), f"{shards} shards, cutoff {cutoff}: state differs"
+            assert shard_error == error, f"{shards} shards, cutoff {cutoff}: intensity_error {shard_error} != {error}"
+        print(f"{name} cutoff={cutoff}: {ticks} ticks, 1 / 2 / 3 shards identical (intensity_error {error:.3g})")
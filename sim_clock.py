@@ -0,0 +1,37 @@
+# -------------------------
+# Fixed-timestep simulation clock (decoupled from the render rate)
+# -------------------------
+class FixedStepClock:
+    def __init__(self, step_hz=60, max_catch_up=5):
+        self.dt = 1 / step_hz
+        self.max_catch_up = max_catch_up
+        self.accumulator = 0.0
+        self.dropped = 0
+
+    def advance(self, elapsed):
+        # Returns how many physics steps to run for `elapsed` wall seconds
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_catch_up:
+            # Too far behind: drop the backlog instead of spiralling
+            self.dropped += steps - self.max_catch_up
+            steps = self.max_catch_up
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        # Fraction of a step left over, used to interpolate drawing
+        return min(1.0, self.accumulator / self.dt)
+
+
+def lerp_pose(prev, current, alpha, width, height):
+    # (x, y, heading) between two steps; positions take the short way
+    # across the wrap-around edges. Works on scalars and NumPy arrays.
+    px, py, ph = prev
+    x, y, h = current
+    dx = (x - px + width / 2) % width - width / 2
+    dy = (y - py + height / 2) % height - height / 2
+    return (px + dx * alpha) % width, (py + dy * alpha) % height, ph + (h - ph) * alpha
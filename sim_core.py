@@ -0,0 +1,1036 @@
+import importlib
+import inspect
+import math
+import random
+import time
+
+import numpy as np
+from lazy_pygame import lazy_module, pygame
+from intensity import SCALAR_LIGHTS, light_intensity, scalar_intensity
+from checkpoint import CheckpointWriter, read as read_checkpoint
+from lightfield import LightField, IntensityGrid
+from obstacles import ObstacleField, scatter
+from headless import run_cli
+from profiler import AllocationTracer, FrameProfiler
+from recorder import TrajectoryWriter, vehicle_columns
+from render_cache import SpriteCache, labels
+from renderer import DirtyRenderer
+from shards import ShardPool
+from sim_clock import FixedStepClock, lerp_pose
+from swarm import COLUMNS, PREVIOUS, Swarm, SwarmRow
+from swarm_render import SwarmSprites, TiledSprites
+
+# Only the async loop needs asyncio (~55 ms to import); headless runs and
+# sweep workers skip it, as they skip pygame. telemetry.py (which imports
+# it too) is imported where a server or sink is made.
+asyncio = lazy_module("asyncio")
+
+# ==========================
+# Light (shared by every scenario)
+# ==========================
+class Light:
+    def __init__(self, x, y, radius=15, field=None):
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.dragging = False
+        # Registered lights keep the spatial index in sync when moved
+        self.field = field
+        if field is not None:
+            self.index = field.add(x, y)
+
+    def pos(self):
+        return (self.x, self.y)
+
+    def move_light(self, new_pos):
+        self.x, self.y = new_pos
+        if self.field is not None:
+            self.field.move(self.index, self.x, self.y)
+
+    def handle_event(self, event):
+        # Drag with the mouse
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if math.dist(event.pos, (self.x, self.y)) < self.radius:
+                self.dragging = True
+        if event.type == pygame.MOUSEBUTTONUP:
+            self.dragging = False
+        if event.type == pygame.MOUSEMOTION and self.dragging:
+            self.move_light(event.pos)
+
+    def draw(self, surface):
+        pygame.draw.circle(surface, (255, 255, 0), (int(self.x), int(self.y)), self.radius)
+        return pygame.draw.circle(surface, (0, 0, 0), (int(self.x), int(self.y)), self.radius, 2)
+
+
+def light_points(lights):
+    # Vehicles accept a LightField or any sequence of (x, y); callers loop
+    # over the points in Python, which is faster over lists than array rows
+    return lights.positions.tolist() if isinstance(lights, LightField) else lights
+
+
+# ==========================
+# Agent: base for vehicles stepped one by one (not swarm rows)
+#
+#   A model overrides steer(lights, cutoff) (sensors -> heading, speed;
+#   the default keeps both, driving straight on) and supplies a body:
+#   sprite_key() + build_body() for a cached sprite, or its own
+#   draw_body(). The base keeps the previous pose for interpolated
+#   drawing, moves and wraps, and draws at the interpolated pose. STATE
+#   lists the attributes that change while running (saved by
+#   checkpoints); models extend it with their own.
+#
+#   Light sensors: sensor_points() lists the points steer() reads with
+#   sense() this tick, in SENSOR_MODEL falloff. Simulation.step senses
+#   every agent's points in one pass and hands each its readings; an
+#   agent stepped on its own computes them in sense().
+# ==========================
+# Vehicle bodies are rendered once, rotations quantized to 1 degree
+sprites = SpriteCache(angle_buckets=360)
+
+
+class Agent:
+    STATE = ("x", "y", "heading", "speed", "prev_pose")
+    SENSOR_MODEL = "soft"
+
+    def __init__(self, x, y, color, rng=random, bounds=(800, 600), heading=None):
+        self.x = x
+        self.y = y
+        self.heading = rng.uniform(0, 2 * math.pi) if heading is None else heading
+        self.prev_pose = (self.x, self.y, self.heading)
+        self.color = color
+        self.rng = rng
+        self.speed = 0
+        self.width, self.height = bounds
+        # Readings of sensor_points() filled in by Simulation.step
+        self.sensed = None
+
+    # --- Physics ---
+    def update(self, lights, cutoff=None):
+        # lights: sequence of (x, y) or a LightField
+        self.prev_pose = (self.x, self.y, self.heading)
+        self.steer(lights, cutoff)
+        self.move()
+
+    def steer(self, lights, cutoff=None):
+        # No sensors: keep heading and speed
+        pass
+
+    def move(self):
+        self.x += math.cos(self.heading) * self.speed
+        self.y += math.sin(self.heading) * self.speed
+        self.x %= self.width
+        self.y %= self.height
+
+    def sensors(self, angle, offset):
+        # (left, right) sensor positions, +-angle off the heading
+        return [
+            (self.x + math.cos(self.heading + angle) * offset, self.y + math.sin(self.heading + angle) * offset),
+            (self.x + math.cos(self.heading - angle) * offset, self.y + math.sin(self.heading - angle) * offset),
+        ]
+
+    def sensor_points(self):
+        # Points sense() reads this tick (none: the agent reads no light)
+        return []
+
+    def sense(self, lights, cutoff=None):
+        # Summed intensity at each of sensor_points(); a LightField answers
+        # from its index
+        sensed, self.sensed = self.sensed, None
+        if sensed is not None:
+            return sensed
+        points = self.sensor_points()
+        if isinstance(lights, LightField):
+            return lights.intensity(points, self.SENSOR_MODEL, cutoff)[0]
+        return light_intensity(points, lights, self.SENSOR_MODEL)
+
+    # --- Drawing ---
+    def pose(self, alpha=1.0):
+        # alpha interpolates between the last two physics steps
+        return lerp_pose(self.prev_pose, (self.x, self.y, self.heading), alpha, self.width, self.height)
+
+    def draw(self, surface, alpha=1.0):
+        x, y, heading = self.pose(alpha)
+        return self.draw_body(surface, x, y, heading).unionall(self.draw_info(surface, x, y))
+
+    def draw_body(self, surface, x, y, heading):
+        key = (type(self).__name__,) + self.sprite_key()
+        return sprites.blit(surface, key, self.build_body, heading, (x, y))
+
+    def draw_info(self, surface, x, y):
+        # Rects of any debug text drawn next to the body
+        return []
+
+
+# ==========================
+# Model registry
+#
+#   A model is a factory(sim, x, y, color) -> vehicle. Vehicles either live
+#   in sim.swarm (SwarmRow views, stepped together) or are Agents with
+#   update(field, cutoff) themselves; all have draw(surface, alpha).
+# ==========================
+MODELS = {}
+
+# Module that registers each model; imported on first use
+MODEL_SOURCES = {
+    "fear": "v_2", "aggression": "v_2", "fear_classic": "v_2", "aggression_classic": "v_2",
+    "fear_fast": "v_2", "aggression_fast": "v_2",
+    "memory_fear": "v3_t", "memory_aggression": "v3_t",
+    "love": "v_4", "explorer": "v_4", "figure8": "v_4", "orange_dash": "v_4",
+    "love_stop": "v_3", "fear_explorer": "v_3", "wander_explorer": "v_3", "approach_explorer": "v_3",
+    "wanderer": "V_1",
+}
+
+
+def register_model(name):
+    def register(factory):
+        MODELS[name] = factory
+        return factory
+    return register
+
+
+def model(name):
+    if name not in MODELS and name in MODEL_SOURCES:
+        importlib.import_module(MODEL_SOURCES[name])
+    if name not in MODELS:
+        raise KeyError(f"unknown vehicle model {name!r}")
+    return MODELS[name]
+
+
+# ==========================
+# Scenario configs
+#
+#   vehicles: {"model", "x", "y", "color", "count"}; an (lo, hi) x or y is
+#   drawn with rng.randint. Label positions with a negative y count from
+#   the bottom edge. click: "drag" (drag lights), "nearest" (move the
+#   nearest light, right-click adds one) or "first" (move the first light).
+#   Optional: fps, cell_size (LightField), cutoff (sensor cutoff radius),
+#   intensity_grid (grid spacing; sensors of intensity_model read the grid),
+#   record_lights (light slots reserved in recordings), fused (False
+#   steps swarm seek rows without the fused kernel), swarm (Swarm
+#   attributes to set, e.g. the emit / repel interaction radii) and
+#   obstacles (static ("circle", x, y, r) / ("box", x, y, w, h, angle)
+#   specs that wanderers steer around), shards (worker processes for the
+#   swarm rows, see shards.py; --shards sets it) and render_threads
+#   (tiled swarm drawing threads, which rasterize a frame while the next
+#   one steps; --render-threads sets it).
+# ==========================
+V4_SPAWN = {"x": (100, 800), "y": (100, 500)}
+
+SCENARIOS = {
+    "v_4": {
+        "caption": "Braitenberg Vehicles – Multiple Agents",
+        "size": (900, 650),
+        "cell_size": 128,
+        "intensity_model": "clamped",
+        "lights": [(200, 150), (450, 150), (700, 150), (300, 450), (600, 450)],
+        "vehicles": [
+            {"model": "love", "count": 3, "color": (0, 100, 255), **V4_SPAWN},
+            {"model": "explorer", "count": 3, "color": (0, 200, 0), **V4_SPAWN},
+            {"model": "figure8", "count": 3, "color": (200, 0, 200), **V4_SPAWN},
+            {"model": "orange_dash", "count": 3, "color": (255, 165, 0), **V4_SPAWN},
+        ],
+        "click": "drag",
+        "labels": [
+            ("Orange: Dash (max speed + oscillation + nearest-light attraction)", (0, 0, 0), (10, 50)),
+            ("Blue: Love | Green: Explorer | Purple: Figure-8", (0, 0, 0), (10, 10)),
+            ("Drag lights with mouse", (0, 0, 0), (10, 30)),
+        ],
+    },
+    "v_4_test": {
+        "caption": "Braitenberg Vehicles – Multiple Agents",
+        "size": (900, 650),
+        "cell_size": 128,
+        "intensity_model": "clamped",
+        "lights": [(200, 150), (450, 150), (700, 150), (300, 450), (600, 450)],
+        "vehicles": [
+            {"model": "love", "count": 3, "color": (0, 100, 255), **V4_SPAWN},
+            {"model": "explorer", "count": 3, "color": (0, 200, 0), **V4_SPAWN},
+            {"model": "figure8", "count": 3, "color": (200, 0, 200), **V4_SPAWN},
+        ],
+        "click": "drag",
+        "labels": [
+            ("Blue: Love | Green: Explorer | Purple: Figure-8", (0, 0, 0), (10, 10)),
+            ("Drag lights with mouse", (0, 0, 0), (10, 30)),
+        ],
+    },
+    "v_4_crowd": {
+        "caption": "Braitenberg Vehicles – Interacting Crowd",
+        "size": (900, 650),
+        "cell_size": 128,
+        "intensity_model": "clamped",
+        "lights": [(200, 150), (700, 150), (450, 450)],
+        "vehicles": [
+            {"model": "love", "count": 120, "color": (0, 100, 255), "x": (0, 899), "y": (0, 649)},
+            {"model": "explorer", "count": 120, "color": (0, 200, 0), "x": (0, 899), "y": (0, 649)},
+            {"model": "figure8", "count": 80, "color": (200, 0, 200), "x": (0, 899), "y": (0, 649)},
+            {"model": "orange_dash", "count": 80, "color": (255, 165, 0), "x": (0, 899), "y": (0, 649)},
+        ],
+        # Vehicles glow like dim lights and do not overlap (body radius 14)
+        "swarm": {"emit_radius": 60, "emit_gain": 0.5, "repel_radius": 28, "repel_gain": 0.5},
+        "click": "drag",
+        "labels": [
+            ("Vehicles glow and push each other apart", (0, 0, 0), (10, 10)),
+            ("Drag lights with mouse", (0, 0, 0), (10, 30)),
+        ],
+    },
+    "v_2": {
+        "caption": "Braitenberg Vehicle 2: Fear and Aggression",
+        "size": (800, 600),
+        "intensity_model": "soft",
+        "lights": [(400, 200), (400, 400)],
+        "record_lights": 64,
+        "vehicles": [
+            {"model": "fear", "x": 400, "y": 300, "color": (0, 100, 255)},
+            {"model": "aggression", "x": 600, "y": 300, "color": (255, 100, 0)},
+        ],
+        "click": "nearest",
+        "labels": [
+            ("Vehicle 2a (Fear / Coward)", (0, 0, 150), (20, 20)),
+            ("Vehicle 2b (Aggression / Anger)", (150, 0, 0), (20, 40)),
+            ("Click to move lights, right-click to add one", (0, 0, 0), (20, -30)),
+        ],
+    },
+    "third": {
+        "caption": "Braitenberg Vehicle 2: Fear and Aggression",
+        "size": (800, 600),
+        "intensity_model": "soft",
+        "lights": [(400, 200), (400, 400)],
+        "record_lights": 64,
+        "vehicles": [
+            {"model": "fear_classic", "x": 400, "y": 300, "color": (0, 100, 255)},
+            {"model": "aggression_classic", "x": 600, "y": 300, "color": (255, 100, 0)},
+        ],
+        "click": "nearest",
+        "labels": [
+            ("Vehicle 2a (Fear / Coward)", (0, 0, 150), (20, 20)),
+            ("Vehicle 2b (Aggression / Anger)", (150, 0, 0), (20, 40)),
+            ("Left click: Move light | Right click: Add light", (0, 0, 0), (20, -30)),
+        ],
+    },
+    "v_2_fast": {
+        "caption": "Braitenberg Vehicle 2: Fear and Aggression (Fast Mode)",
+        "size": (800, 600),
+        "intensity_model": "soft",
+        "lights": [(400, 200), (400, 400)],
+        "vehicles": [
+            {"model": "fear_fast", "x": 400, "y": 300, "color": (0, 100, 255)},
+            {"model": "aggression_fast", "x": 600, "y": 300, "color": (255, 100, 0)},
+        ],
+        "click": "nearest",
+        "add_lights": False,
+        "labels": [
+            ("Vehicle 2a (Fear / Coward)", (0, 0, 150), (20, 20)),
+            ("Vehicle 2b (Aggression / Anger)", (150, 0, 0), (20, 40)),
+            ("Click to move lights", (0, 0, 0), (20, -30)),
+        ],
+    },
+    "v3_t": {
+        "caption": "Braitenberg Vehicle 3: Memory & Internal State",
+        "size": (800, 600),
+        "intensity_model": "soft",
+        "lights": [(400, 200), (400, 400)],
+        "vehicles": [
+            {"model": "memory_fear", "x": 350, "y": 300, "color": (0, 120, 255)},
+            {"model": "memory_aggression", "x": 550, "y": 300, "color": (255, 120, 0)},
+        ],
+        "click": "first",
+        "labels": [
+            ("Vehicle 3a: Fear + Memory", (0, 0, 150), (20, 20)),
+            ("Vehicle 3b: Aggression + Memory", (150, 0, 0), (20, 40)),
+            ("Click to move light", (0, 0, 0), (20, -30)),
+        ],
+    },
+    "v_3": {
+        "caption": "Braitenberg Vehicles – Love and Fear Explorer",
+        "size": (800, 600),
+        "intensity_model": "soft",
+        "lights": [(266, 200), (533, 400)],
+        "vehicles": [
+            {"model": "love_stop", "x": 200, "y": 300, "color": (0, 100, 255)},
+            {"model": "fear_explorer", "x": 400, "y": 300, "color": (0, 200, 0)},
+        ],
+        "click": "drag",
+        "labels": [
+            ("Blue: Love Vehicle (Stops near light)", (0, 0, 0), (10, 10)),
+            ("Green: Fear Explorer (Moves away from lights)", (0, 0, 0), (10, 30)),
+            ("Click/drag to move the nearest light", (0, 0, 0), (10, -25)),
+        ],
+    },
+    "v_3_wander": {
+        "caption": "Braitenberg Vehicles – Love and Explorer",
+        "size": (800, 600),
+        "intensity_model": "soft",
+        "lights": [(266, 200), (533, 400)],
+        "vehicles": [
+            {"model": "love_stop", "x": 200, "y": 300, "color": (0, 100, 255)},
+            {"model": "wander_explorer", "x": 400, "y": 300, "color": (0, 200, 0)},
+        ],
+        "click": "drag",
+        "labels": [
+            ("Blue: Love Vehicle (Stops near light)", (0, 0, 0), (10, 10)),
+            ("Green: Explorer Vehicle (Moves continuously, slightly turns near lights)", (0, 0, 0), (10, 30)),
+            ("Click/drag to move the nearest light", (0, 0, 0), (10, -25)),
+        ],
+    },
+    "v_3_approach": {
+        "caption": "Braitenberg Vehicles – Love and Explorer",
+        "size": (800, 600),
+        "intensity_model": "soft",
+        "lights": [(266, 200), (533, 400)],
+        "vehicles": [
+            {"model": "love_stop", "x": 200, "y": 300, "color": (0, 100, 255)},
+            {"model": "approach_explorer", "x": 400, "y": 300, "color": (0, 200, 0)},
+        ],
+        "click": "nearest",
+        "add_lights": False,
+        "labels": [
+            ("Blue: Love Vehicle (Stops near light)", (0, 0, 0), (10, 10)),
+            ("Green: Explorer Vehicle (Slow approach)", (0, 0, 0), (10, 30)),
+            ("Click to move the nearest light", (0, 0, 0), (10, -25)),
+        ],
+    },
+    "v_1": {
+        "caption": "Vehicle with Movable Lights",
+        "size": (600, 600),
+        "lights": [(200, 300), (400, 300)],
+        "vehicles": [
+            {"model": "wanderer", "x": 300, "y": 300, "color": (0, 0, 255)},
+        ],
+        "click": "nearest",
+        # Clicking also gives vehicles that can accelerate a one second boost
+        "boost_on_click": 60,
+        "add_lights": False,
+        "labels": [],
+    },
+    "v_1_obstacles": {
+        "caption": "Wanderers among Obstacles",
+        "size": (900, 650),
+        "lights": [(250, 325), (650, 325)],
+        "vehicles": [
+            {"model": "wanderer", "count": 12, "x": (0, 899), "y": (0, 649), "color": (0, 0, 255)},
+        ],
+        "obstacles": scatter(120, 900, 650, seed=1),
+        "click": "nearest",
+        "boost_on_click": 60,
+        "add_lights": False,
+        "labels": [("Click: move the nearest light and boost", (0, 0, 0), (10, -25))],
+    },
+}
+
+
+# ==========================
+# Simulation: one scenario's lights + vehicles, no display needed
+# ==========================
+class Simulation:
+    def __init__(self, config, rng=random):
+        self.config = config
+        self.width, self.height = config["size"]
+        self.fps = config.get("fps", 60)
+        self.cutoff = config.get("cutoff")
+        self.rng = rng
+        self.tick = 0
+        self.swarm = None
+        self.vehicles = []
+        # Vehicles stepped one by one; swarm rows are stepped together
+        self.agents = []
+        self.obstacles = ObstacleField(config.get("obstacles", ()), size=(self.width, self.height))
+
+        for spec in config["vehicles"]:
+            factory = model(spec["model"])
+            for _ in range(spec.get("count", 1)):
+                x, y = self._coordinate(spec["x"]), self._coordinate(spec["y"])
+                v = factory(self, x, y, spec["color"])
+                self.vehicles.append(v)
+                if not isinstance(v, SwarmRow):
+                    self.agents.append(v)
+
+        # Swarm rows are drawn together, one blits() per frame (or per tile
+        # on render_threads worker threads)
+        self.sprites = None
+        if self.swarm is not None:
+            colors = [v.color for v in self.vehicles if isinstance(v, SwarmRow)]
+            threads = config.get("render_threads")
+            self.sprites = TiledSprites(self.swarm, colors, threads) if threads else SwarmSprites(self.swarm, colors)
+        self.prepared = False
+
+        self.field = LightField(cell_size=config.get("cell_size", 64))
+        self.lights = [Light(x, y, field=self.field) for x, y in config["lights"]]
+        if config.get("intensity_grid"):
+            self.field.attach_grid(IntensityGrid(self.width, self.height, config["intensity_grid"],
+                                                 config.get("intensity_model", "clamped")))
+
+        # Swarm rows stepped by worker processes (close() stops them)
+        self.shards = None
+        if self.swarm is not None and config.get("shards", 1) > 1:
+            if config.get("intensity_grid"):
+                raise ValueError("shards step exact or cutoff intensities, not an intensity_grid")
+            self.shards = ShardPool(self.swarm, config["shards"], self.cutoff,
+                                    cell_size=config.get("cell_size", 64))
+
+    def _coordinate(self, value):
+        return self.rng.randint(*value) if isinstance(value, tuple) else value
+
+    def shared_swarm(self):
+        # Swarm models all add their rows to one Swarm per simulation
+        if self.swarm is None:
+            self.swarm = Swarm(self.width, self.height, self.fps, fused=self.config.get("fused", True))
+            for name, value in self.config.get("swarm", {}).items():
+                setattr(self.swarm, name, value)
+        return self.swarm
+
+    def step(self):
+        if self.shards is not None:
+            self.shards.step(self.field.positions)
+        elif self.swarm is not None:
+            self.swarm.step(self.field, self.cutoff)
+        self.sense()
+        for v in self.agents:
+            v.update(self.field, self.cutoff)
+        self.tick += 1
+
+    def sense(self):
+        # Every agent's sensors in one intensity pass per falloff model, not
+        # one small pass per agent (agents do not see each other, so reading
+        # all of them before the first update changes nothing). With a few
+        # lights and exact sums a Python loop is faster than any NumPy pass.
+        field = self.field
+        groups = {}
+        for v in self.agents:
+            points = v.sensor_points()
+            if points:
+                groups.setdefault(v.SENSOR_MODEL, []).append((v, points))
+        for model, group in groups.items():
+            points = [p for _, points in group for p in points]
+            exact = self.cutoff is None and (field.grid is None or field.grid.model != model)
+            if exact and len(field) < SCALAR_LIGHTS:
+                values = scalar_intensity(points, field.positions.tolist(), model)
+            else:
+                values = field.intensity(points, model, self.cutoff)[0].tolist()
+            start = 0
+            for v, points in group:
+                v.sensed = values[start:start + len(points)]
+                start += len(points)
+
+    def close(self):
+        # Stops shard workers and render threads; the swarm stays readable
+        if self.shards is not None:
+            self.shards.close()
+            self.shards = None
+        if self.sprites is not None:
+            self.sprites.close()
+
+    def tunables(self):
+        # Objects whose attributes a parameter sweep may set
+        return ([self.swarm] if self.swarm is not None else []) + self.agents
+
+    def pose(self):
+        if not self.agents:
+            n = self.swarm.count
+            return self.swarm.x[:n], self.swarm.y[:n]
+        return np.array([v.x for v in self.vehicles]), np.array([v.y for v in self.vehicles])
+
+    # --- Interaction ---
+    def add_light(self, x, y):
+        self.lights.append(Light(x, y, field=self.field))
+
+    def click(self, event):
+        mode = self.config.get("click", "drag")
+        if mode == "drag":
+            for light in self.lights:
+                light.handle_event(event)
+            return
+        if event.type != pygame.MOUSEBUTTONDOWN:
+            return
+        if mode == "nearest" and event.button == 3 and self.config.get("add_lights", True):
+            self.add_light(*event.pos)
+        elif mode == "nearest":
+            self.lights[self.field.nearest(event.pos)[0]].move_light(event.pos)
+        else:
+            self.lights[0].move_light(event.pos)
+        boost = self.config.get("boost_on_click")
+        if boost:
+            for v in self.vehicles:
+                if hasattr(v, "accelerate"):
+                    v.accelerate(boost)
+
+    # --- Drawing ---
+    def background(self, color):
+        # Static obstacles are painted once into the background the renderer
+        # erases with; without obstacles the plain color does
+        if not len(self.obstacles):
+            return color
+        surface = pygame.Surface((self.width, self.height)).convert()
+        surface.fill(color)
+        self.obstacles.draw(surface)
+        return surface
+
+    def prepare(self, surface, alpha=1.0):
+        # Call after a frame is shown: tiled sprites start rasterizing this
+        # frame's poses for the next draw(), overlapping the steps in
+        # between. The swarm is then shown one frame late.
+        if isinstance(self.sprites, TiledSprites):
+            self.sprites.submit(surface, alpha)
+            self.prepared = True
+
+    def draw(self, surface, alpha=1.0, renderer=None):
+        add = renderer.add if renderer is not None else _ignore
+        # Tiled sprites rasterize on their threads while the lights are drawn
+        # (unless prepare() already submitted them)
+        if self.sprites is not None and not self.prepared:
+            self.sprites.submit(surface, alpha)
+        self.prepared = False
+        for light in self.lights:
+            add(light.draw(surface))
+        if self.sprites is not None:
+            for rect in self.sprites.finish():
+                add(rect)
+        for v in self.agents:
+            add(v.draw(surface, alpha))
+
+    def draw_labels(self, surface, renderer):
+        text = labels()
+        for line, color, (x, y) in self.config.get("labels", ()):
+            renderer.add(text.blit(surface, line, color, (x, y if y >= 0 else self.height + y)))
+
+    # --- Recording ---
+    def record_fields(self):
+        fields = ("x", "y", "heading", "speed")
+        if not self.agents:
+            fields += ("behavior",)
+        if any(hasattr(v, "memory") for v in self.agents):
+            fields += ("memory",)
+        return fields
+
+    def recorder(self, path):
+        if path is None:
+            return None
+        capacity = max(len(self.lights), self.config.get("record_lights", 0))
+        return TrajectoryWriter(path, len(self.vehicles), capacity, self.record_fields(),
+                                self.fps, self.width, self.height)
+
+    def columns(self, fields):
+        # {field: one value per vehicle}; swarm columns are live views
+        if not self.agents:
+            n = self.swarm.count
+            return {name: getattr(self.swarm, name)[:n] for name in fields}
+        return vehicle_columns(self.vehicles, fields)
+
+    def record(self, recorder):
+        recorder.write(self.columns(recorder.fields), self.field.positions)
+
+    def server(self, address):
+        # Telemetry stream on a local socket (see telemetry.py)
+        if address is None:
+            return None
+        from telemetry import TelemetryServer
+        return TelemetryServer(address).start(self)
+
+    # --- Checkpoints (see checkpoint.py) ---
+    def _stateful(self):
+        # {attribute: agents that list it in their STATE}
+        found = {}
+        for v in self.agents:
+            for name in v.STATE:
+                found.setdefault(name, []).append(v)
+        return found
+
+    def state(self):
+        # (meta, arrays) copied out between steps: tick, RNG, lights, swarm
+        # rows and agent STATE. Tunables are not included; they come from
+        # the config, so a restored run may change them (forks).
+        version, internal, gauss = self.rng.getstate()
+        meta = {"tick": self.tick, "rng": [version, gauss], "caption": self.config.get("caption")}
+        arrays = {"rng": np.array(internal, dtype=np.uint32), "lights": self.field.positions.copy()}
+        if self.swarm is not None:
+            n = self.swarm.count
+            for name in COLUMNS + PREVIOUS + ("behavior",):
+                arrays["swarm." + name] = getattr(self.swarm, name)[:n].copy()
+        for name, agents in self._stateful().items():
+            arrays["agents." + name] = np.array([getattr(v, name) for v in agents])
+        return meta, arrays
+
+    def restore(self, meta, arrays):
+        # Continue from a state() of a simulation built from the same config
+        stateful = self._stateful()
+        n = self.swarm.count if self.swarm is not None else 0
+        shapes = {key: len(a) for key, a in arrays.items() if key.startswith(("swarm.", "agents."))}
+        expected = {"agents." + name: len(agents) for name, agents in stateful.items()}
+        if n:
+            expected.update(("swarm." + name, n) for name in COLUMNS + PREVIOUS + ("behavior",))
+        if shapes != expected or len(arrays["lights"]) < len(self.lights):
+            raise ValueError(f"checkpoint of {meta.get('caption')!r} does not fit this scenario")
+
+        lights = arrays["lights"].tolist()
+        for light, (x, y) in zip(self.lights, lights):
+            if (light.x, light.y) != (x, y):
+                light.move_light((x, y))
+        for x, y in lights[len(self.lights):]:
+            self.add_light(x, y)
+        if n:
+            for name in COLUMNS + PREVIOUS + ("behavior",):
+                # In place: shard workers and kernel views keep their arrays
+                getattr(self.swarm, name)[:n] = arrays["swarm." + name]
+            self.swarm.kernel.key = None
+        for name, agents in stateful.items():
+            for v, value in zip(agents, arrays["agents." + name].tolist()):
+                setattr(v, name, tuple(value) if isinstance(value, list) else value)
+        version, gauss = meta["rng"]
+        self.rng.setstate((version, tuple(arrays["rng"].tolist()), gauss))
+        self.tick = meta["tick"]
+
+    def checkpoints(self, path, every=600):
+        if path is None:
+            return None
+        return CheckpointWriter(path, every)
+
+
+def _ignore(rect):
+    return rect
+
+
+# ==========================
+# Headless run (no window, no fonts, no frame cap)
+# ==========================
+def run_headless(config, ticks, seed=None, record=None, trace_allocs=False, shards=None, serve=None,
+                 checkpoint=None, checkpoint_every=600, restore=None):
+    if shards:
+        config = dict(config, shards=shards)
+    sim = Simulation(config, random.Random(seed))
+    if restore:
+        sim.restore(*read_checkpoint(restore))
+    recorder = sim.recorder(record)
+    server = sim.server(serve)
+    checkpoints = sim.checkpoints(checkpoint, checkpoint_every)
+    tracer = AllocationTracer() if trace_allocs else None
+    try:
+        for _ in range(ticks):
+            if tracer:
+                tracer.begin()
+            sim.step()
+            if tracer:
+                tracer.end()
+            if recorder:
+                sim.record(recorder)
+            if server:
+                server.publish(sim)
+            if checkpoints:
+                checkpoints.tick(sim)
+        if checkpoints:
+            checkpoints.save(sim)
+    finally:
+        sim.close()
+        if server:
+            server.close()
+        if checkpoints:
+            checkpoints.close()
+        if recorder:
+            recorder.close()
+    if tracer:
+        print(tracer.report())
+    return sim.vehicles
+
+
+# ==========================
+# Main Loop
+# ==========================
+def run_window(config, full_flip=False, seed=None, render_fps=60, max_catch_up=5, record=None, profile=None,
+               shards=None, render_threads=None, serve=None, checkpoint=None, checkpoint_every=600, restore=None):
+    if shards:
+        config = dict(config, shards=shards)
+    if render_threads:
+        config = dict(config, render_threads=render_threads)
+    # Only the display; fonts start with the first label, audio never
+    pygame.display.init()
+    sim = Simulation(config, random.Random(seed))
+    if restore:
+        sim.restore(*read_checkpoint(restore))
+    screen = pygame.display.set_mode((sim.width, sim.height))
+    pygame.display.set_caption(config["caption"])
+    clock = pygame.time.Clock()
+
+    renderer = DirtyRenderer(screen, sim.background((255, 255, 255)), enabled=not full_flip)
+    recorder = sim.recorder(record)
+    server = sim.server(serve)
+    checkpoints = sim.checkpoints(checkpoint, checkpoint_every)
+
+    # Physics always steps at sim.fps; rendering runs at render_fps
+    sim_clock = FixedStepClock(sim.fps, max_catch_up)
+    elapsed = sim_clock.dt
+
+    # F3 toggles the timing overlay, F4 dumps the trace
+    profiler = FrameProfiler(enabled=profile is not None, path=profile or "profile.csv")
+
+    running = True
+    try:
+        while running:
+            renderer.begin()
+            profiler.lap("draw")
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                profiler.handle_event(event)
+                if event.type == pygame.VIDEOEXPOSE:
+                    renderer.invalidate()
+                sim.click(event)
+            profiler.lap("events")
+
+            for _ in range(sim_clock.advance(elapsed)):
+                sim.step()
+                if recorder:
+                    sim.record(recorder)
+                if server:
+                    server.publish(sim)
+                if checkpoints:
+                    checkpoints.tick(sim)
+            profiler.lap("update")
+
+            sim.draw(screen, sim_clock.alpha, renderer)
+            profiler.lap("draw")
+
+            sim.draw_labels(screen, renderer)
+            profiler.lap("text")
+            renderer.add(profiler.draw(screen, labels(), (sim.width - 240, 10)))
+            profiler.lap("overlay")
+
+            renderer.end()
+            sim.prepare(screen, sim_clock.alpha)
+            profiler.lap("flip")
+            elapsed = clock.tick(render_fps) / 1000
+            profiler.lap("wait")
+            profiler.end_frame()
+        if checkpoints:
+            checkpoints.save(sim)
+    finally:
+        # Also when a step or a writer fails: the recording and the
+        # display are always finalized
+        sim.close()
+        if server:
+            server.close()
+        if checkpoints:
+            checkpoints.close()
+        if recorder:
+            recorder.close()
+        if profile:
+            profiler.dump()
+        pygame.quit()
+
+
+# ==========================
+# Async main loop: input, stepping, drawing and telemetry as tasks
+#
+#   Every task runs at its own rate. Steps run on a worker thread, so
+#   events keep being read while a long step is in flight. The light
+#   field is held meanwhile: drags move the lights at once and reach the
+#   field when the step ends. Clicks that query the field ("nearest" /
+#   "first") wait for it. Drawing and telemetry take turns with steps, so
+#   they always see whole ticks.
+# ==========================
+class AsyncLoop:
+    def __init__(self, sim, screen, renderer, profiler, recorder=None, render_fps=60, max_catch_up=5,
+                 input_hz=250, telemetry=None, telemetry_hz=10, server=None, checkpoints=None):
+        self.sim = sim
+        self.screen = screen
+        self.renderer = renderer
+        self.profiler = profiler
+        self.recorder = recorder
+        self.server = server
+        self.checkpoints = checkpoints
+        self.render_fps = render_fps
+        self.input_hz = input_hz
+        self.telemetry = telemetry
+        self.telemetry_hz = telemetry_hz
+        self.sim_clock = FixedStepClock(sim.fps, max_catch_up)
+        self.advanced = time.perf_counter()
+        self.running = True
+        # Set while no step is running
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.queued = []
+        self.ticks = 0
+        self.frames = 0
+        self.step_ms = 0.0
+
+    async def run(self):
+        tasks = [asyncio.create_task(self.read_input()), asyncio.create_task(self.simulate()),
+                 asyncio.create_task(self.render())]
+        if self.telemetry is not None:
+            tasks.append(asyncio.create_task(self.export()))
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            self.running = False
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for task in done:
+            task.result()
+
+    # --- Input ---
+    async def read_input(self):
+        drag = self.sim.config.get("click", "drag") == "drag"
+        while self.running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.running = False
+                self.profiler.handle_event(event)
+                if event.type == pygame.VIDEOEXPOSE:
+                    self.renderer.invalidate()
+                if drag or self.idle.is_set():
+                    self.sim.click(event)
+                else:
+                    self.queued.append(event)
+            await asyncio.sleep(1 / self.input_hz)
+
+    # --- Simulation ---
+    async def simulate(self):
+        clock = self.sim_clock
+        while self.running:
+            now = time.perf_counter()
+            steps = clock.advance(now - self.advanced)
+            self.advanced = now
+            for _ in range(steps):
+                await self.step()
+                # Let input and drawing in between catch-up steps
+                await asyncio.sleep(0)
+            await asyncio.sleep(max(0.0, clock.dt - clock.accumulator))
+
+    async def step(self):
+        for event in self.queued:
+            self.sim.click(event)
+        self.queued.clear()
+        field = self.sim.field
+        start = time.perf_counter()
+        self.idle.clear()
+        field.hold()
+        try:
+            await asyncio.to_thread(self.sim.step)
+        finally:
+            field.release()
+            self.idle.set()
+        self.step_ms = (time.perf_counter() - start) * 1000
+        self.ticks += 1
+        if self.recorder:
+            self.sim.record(self.recorder)
+        if self.server:
+            self.server.publish(self.sim)
+        if self.checkpoints:
+            self.checkpoints.tick(self.sim)
+
+    # --- Drawing ---
+    def alpha(self):
+        clock = self.sim_clock
+        return min(1.0, (clock.accumulator + time.perf_counter() - self.advanced) / clock.dt)
+
+    async def render(self):
+        sim, screen, renderer, profiler = self.sim, self.screen, self.renderer, self.profiler
+        period = 1 / self.render_fps
+        due = time.perf_counter()
+        while self.running:
+            await self.idle.wait()
+            profiler.lap("wait")
+            renderer.begin()
+            sim.draw(screen, self.alpha(), renderer)
+            profiler.lap("draw")
+            sim.draw_labels(screen, renderer)
+            profiler.lap("text")
+            renderer.add(profiler.draw(screen, labels(), (sim.width - 240, 10)))
+            profiler.lap("overlay")
+            renderer.end()
+            sim.prepare(screen, self.alpha())
+            profiler.lap("flip")
+            profiler.end_frame()
+            self.frames += 1
+
+            # Next frame on the render_fps grid; a late frame does not bunch up
+            now = time.perf_counter()
+            due = max(due + period, now)
+            await asyncio.sleep(due - now)
+
+    # --- Telemetry ---
+    def stats(self):
+        return {"tick": self.ticks, "frame": self.frames, "step_ms": round(self.step_ms, 3),
+                "dropped": self.sim_clock.dropped, "queued": len(self.queued)}
+
+    async def export(self):
+        while self.running:
+            await asyncio.sleep(1 / self.telemetry_hz)
+            await self.idle.wait()
+            result = self.telemetry(self.sim, self.stats())
+            if inspect.isawaitable(result):
+                await result
+
+
+def run_async(config, full_flip=False, seed=None, render_fps=60, max_catch_up=5, record=None, profile=None,
+              shards=None, render_threads=None, input_hz=250, telemetry=None, telemetry_hz=10, serve=None,
+              checkpoint=None, checkpoint_every=600, restore=None):
+    # telemetry: a sink(sim, stats) or a path for JSON lines
+    if shards:
+        config = dict(config, shards=shards)
+    if render_threads:
+        config = dict(config, render_threads=render_threads)
+    pygame.display.init()
+    sim = Simulation(config, random.Random(seed))
+    if restore:
+        sim.restore(*read_checkpoint(restore))
+    screen = pygame.display.set_mode((sim.width, sim.height))
+    pygame.display.set_caption(config["caption"])
+    renderer = DirtyRenderer(screen, sim.background((255, 255, 255)), enabled=not full_flip)
+    recorder = sim.recorder(record)
+    profiler = FrameProfiler(enabled=profile is not None, path=profile or "profile.csv")
+    if isinstance(telemetry, str):
+        from telemetry import JsonLinesTelemetry
+        telemetry = JsonLinesTelemetry(telemetry)
+    sink = telemetry
+
+    server = sim.server(serve)
+    checkpoints = sim.checkpoints(checkpoint, checkpoint_every)
+
+    loop = AsyncLoop(sim, screen, renderer, profiler, recorder, render_fps, max_catch_up,
+                     input_hz, sink, telemetry_hz, server, checkpoints)
+    try:
+        asyncio.run(loop.run())
+        if checkpoints:
+            checkpoints.save(sim)
+    finally:
+        # Also when a step or a writer fails, as in run_window
+        sim.close()
+        if server:
+            server.close()
+        if checkpoints:
+            checkpoints.close()
+        if recorder:
+            recorder.close()
+        if hasattr(sink, "close"):
+            sink.close()
+        if profile:
+            profiler.dump()
+        pygame.quit()
+    return loop
+
+
+def run_scenario(name, description=None):
+    # Command line (--headless, --seed, --record, ...) for one scenario
+    config = SCENARIOS[name]
+
+    def main(async_loop=False, telemetry=None, telemetry_hz=10, **options):
+        if async_loop:
+            run_async(config, telemetry=telemetry, telemetry_hz=telemetry_hz, **options)
+        else:
+            run_window(config, **options)
+
+    def headless(ticks, seed=None, record=None, trace_allocs=False, shards=None, serve=None,
+                 checkpoint=None, checkpoint_every=600, restore=None):
+        return run_headless(config, ticks, seed, record, trace_allocs, shards, serve,
+                            checkpoint, checkpoint_every, restore)
+
+    run_cli(main, headless, description or config["caption"])
+
+
+if __name__ == "__main__":
+    import sys
+    import sim_core
+    # python sim_core.py <scenario> [--headless ...]; models register with
+    # the importable sim_core module, not with __main__
+    name = sys.argv.pop(1) if len(sys.argv) > 1 and not sys.argv[1].startswith("-") else "v_4"
+    if name not in sim_core.SCENARIOS:
+        raise SystemExit(f"unknown scenario {name!r}; choose from {', '.join(sorted(sim_core.SCENARIOS))}")
+    sim_core.run_scenario(name)
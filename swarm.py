@@ -0,0 +1,513 @@
+import math
+import numpy as np
+from intensity import MODELS, light_intensity, squared_distances
+from lightfield import LightField
+from neighbors import CellList
+from sim_clock import lerp_pose
+
+# -------------------------
+# Behavior codes
+# -------------------------
+BEHAVIORS = ("love", "explorer", "figure8", "orange_dash")
+LOVE, EXPLORER, FIGURE8, ORANGE_DASH = range(len(BEHAVIORS))
+
+# Per-behavior steering constants, indexed by behavior code
+OSC_GAIN = np.array([0.0, 0.0, 0.12, 0.15])
+OSC_FREQ = np.array([0.0, 0.0, 0.6, 0.7])
+ATTRACT_GAIN = np.array([0.0, 0.05, 0.03, 0.05])
+
+THRESHOLD = 50
+TURN_GAIN = 0.05
+COLUMNS = ("x", "y", "heading", "speed", "time", "max_speed")
+# Pose at the start of the last step, for interpolated drawing
+PREVIOUS = ("prev_x", "prev_y", "prev_heading")
+
+
+# -------------------------
+# Swarm (struct-of-arrays vehicle state)
+# -------------------------
+class Swarm:
+    def __init__(self, width, height, fps=60, sensor_offset=20, capacity=64, fused=True):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.sensor_offset = sensor_offset
+        # Fused, preallocated step (exact intensity only: no cutoff, no grid)
+        self.fused = fused
+        self.kernel = SwarmKernel()
+        # Tunables (see sweep.py)
+        self.threshold = THRESHOLD
+        self.turn_gain = TURN_GAIN
+        self.attract_gain = ATTRACT_GAIN.copy()
+        # Vehicle-vehicle interactions, off at radius 0: each vehicle glows
+        # like a light (emit) and overlapping vehicles are pushed apart (repel)
+        self.emit_radius = 0
+        self.emit_gain = 0.5
+        self.repel_radius = 0
+        self.repel_gain = 0.5
+        self.contacts = 0
+        self._cells = {}
+        self.count = 0
+        self.intensity_error = 0.0
+        for name in COLUMNS + PREVIOUS:
+            setattr(self, name, np.zeros(capacity))
+        self.behavior = np.zeros(capacity, dtype=np.int8)
+
+    def _grow(self, capacity):
+        for name in COLUMNS + PREVIOUS + ("behavior",):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, x, y, heading, behavior, time=0.0, max_speed=None):
+        if self.count == len(self.x):
+            self._grow(2 * len(self.x))
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.heading[i] = self.prev_heading[i] = heading
+        self.speed[i] = 0
+        self.time[i] = time
+        if max_speed is None:
+            max_speed = 6 if behavior != "explorer" else 4
+        self.max_speed[i] = max_speed
+        self.behavior[i] = BEHAVIORS.index(behavior)
+        self.count += 1
+        return i
+
+    def step(self, light_positions, cutoff=None):
+        # light_positions: sequence of (x, y) or a LightField (grid-indexed)
+        field = light_positions if isinstance(light_positions, LightField) else None
+        lights = field.positions if field is not None else np.asarray(light_positions, dtype=float).reshape(-1, 2)
+        self.intensity_error = 0.0
+        if self.emit_radius:
+            self.emitters = self.cell_list(self.emit_radius).build(self.x[:self.count], self.y[:self.count])
+        if self.fused and cutoff is None and (field is None or field.grid is None):
+            # Exact sums: the buffered kernel does the rest of the step
+            self.kernel.step(self, lights, field.version if field is not None else None)
+            self._repel()
+            return
+
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        heading, speed = self.heading[:n], self.speed[:n]
+        time, max_speed = self.time[:n], self.max_speed[:n]
+        behavior = self.behavior[:n]
+        lx, ly = lights[:, 0], lights[:, 1]
+
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        self.prev_heading[:n] = heading
+        time += 1 / self.fps
+
+        # --- Love: two sensors, motors slow down near light ---
+        love = np.flatnonzero(behavior == LOVE)
+        if love.size:
+            h = heading[love]
+            motors = []
+            for angle in (math.pi / 4, -math.pi / 4):
+                sx = x[love] + np.cos(h + angle) * self.sensor_offset
+                sy = y[love] + np.sin(h + angle) * self.sensor_offset
+                sensor = self._intensity(np.column_stack((sx, sy)), lights, field, cutoff)
+                if self.emit_radius:
+                    sensor += self.glow(sx, sy, love)
+                motors.append(np.maximum(0, max_speed[love] * (1 - sensor / self.threshold)))
+            left_motor, right_motor = motors
+            heading[love] = h + (right_motor - left_motor) * self.turn_gain
+            speed[love] = (left_motor + right_motor) / 2
+
+        # --- Explorer / figure8 / orange_dash: steer toward nearest light ---
+        seek = np.flatnonzero(behavior != LOVE)
+        if seek.size:
+            code = behavior[seek]
+            pos = np.column_stack((x[seek], y[seek]))
+            if field is None:
+                d2 = squared_distances(pos, lights)
+                total = MODELS["clamped"](d2).sum(axis=1)
+            else:
+                total = self._intensity(pos, lights, field, cutoff)
+            if self.emit_radius:
+                total = total + self.glow(pos[:, 0], pos[:, 1], seek)
+
+            ms = max_speed[seek]
+            speed[seek] = np.select(
+                [code == EXPLORER, code == FIGURE8],
+                [ms / (1 + np.log1p(total)), ms * np.maximum(0, 1 - total / self.threshold)],
+                ms,
+            )
+
+            h = heading[seek] + OSC_GAIN[code] * np.sin(2 * math.pi * OSC_FREQ[code] * time[seek])
+            if lights.size:
+                nearest = d2.argmin(axis=1) if field is None else field.nearest(pos)
+                angle = np.arctan2(ly[nearest] - y[seek], lx[nearest] - x[seek])
+                diff = (angle - h + math.pi) % (2 * math.pi) - math.pi
+                h += self.attract_gain[code] * diff
+            heading[seek] = h
+
+        # --- Move + wrap ---
+        x += np.cos(heading) * speed
+        y += np.sin(heading) * speed
+        x %= self.width
+        y %= self.height
+        self._repel()
+
+    # --- Vehicle-vehicle interactions (cell list over the wrapped screen) ---
+    def cell_list(self, radius):
+        cells = self._cells.get(radius)
+        if cells is None:
+            cells = self._cells[radius] = CellList(self.width, self.height, radius)
+        return cells
+
+    def glow(self, qx, qy, rows):
+        # Light from the other vehicles within emit_radius at the query
+        # points; rows[i] is the vehicle query i belongs to (not counted)
+        total = np.zeros(len(qx))
+        for block in self.emitters.blocks(len(qx)):
+            query, _, dx, dy = self.emitters.query(qx[block], qy[block], rows[block])
+            light = MODELS["clamped"](dx * dx + dy * dy) * self.emit_gain
+            total[block] = np.bincount(query, weights=light, minlength=len(total[block]))
+        return total
+
+    def _repel(self):
+        # Each overlapping pair moves apart by repel_gain of the overlap,
+        # half each, along the shortest way around the torus
+        self.contacts = 0
+        if not self.repel_radius:
+            return
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        shift_x, shift_y = np.zeros(n), np.zeros(n)
+        for i, j, dx, dy in self.cell_list(self.repel_radius).build(x, y).iter_pairs():
+            self.contacts += len(i)
+            d = np.sqrt(dx * dx + dy * dy)
+            push = self.repel_gain * (self.repel_radius - d) / (2 * np.maximum(d, 1e-9))
+            px, py = push * dx, push * dy
+            shift_x += np.bincount(j, weights=px, minlength=n) - np.bincount(i, weights=px, minlength=n)
+            shift_y += np.bincount(j, weights=py, minlength=n) - np.bincount(i, weights=py, minlength=n)
+        # Pushes are summed first, so every pair sees the same start positions
+        x += shift_x
+        y += shift_y
+        x %= self.width
+        y %= self.height
+
+    def interpolate(self, alpha):
+        # (x, y, heading) arrays between the last two steps
+        n = self.count
+        prev = (self.prev_x[:n], self.prev_y[:n], self.prev_heading[:n])
+        current = (self.x[:n], self.y[:n], self.heading[:n])
+        return lerp_pose(prev, current, alpha, self.width, self.height)
+
+    def pose(self, i, alpha=1.0):
+        prev = (self.prev_x[i], self.prev_y[i], self.prev_heading[i])
+        current = (self.x[i], self.y[i], self.heading[i])
+        return lerp_pose(prev, current, alpha, self.width, self.height)
+
+    def _intensity(self, points, lights, field, cutoff):
+        if field is None:
+            return light_intensity(points, lights)
+        total, error = field.intensity(points, "clamped", cutoff)
+        if error.size:
+            self.intensity_error = max(self.intensity_error, float(error.max()))
+        return total
+
+
+# -------------------------
+# Light pass: clamped intensity sum (and nearest light) for m points
+#
+#   Loops over the shorter side (lights or points) with contiguous vectors
+#   along the longer one. Broadcasting a column across a 2-D tile would
+#   make the ufunc iterator allocate a buffer per call whenever the tile is
+#   narrow; 0-d views into the columns do not, and they follow the columns
+#   when those are refreshed in place. Reads self.x / self.y, writes
+#   self.total (and self.nearest; ties keep the lowest index, like argmin).
+# -------------------------
+class LightPass:
+    def __init__(self, lx, ly, m, nearest=False):
+        self.lx, self.ly = lx, ly
+        self.x, self.y = np.empty(m), np.empty(m)
+        self.total = np.empty(m)
+        self.nearest = np.zeros(m, dtype=np.intp) if nearest else None
+        self.by_light = len(lx) <= m
+        if self.by_light:
+            self.d2, self.dy = np.empty(m), np.empty(m)
+            self.best = np.empty(m)
+            self.closer = np.empty(m, dtype=bool)
+            self.lights = [(np.array(k, dtype=np.intp), _item(lx, k), _item(ly, k)) for k in range(len(lx))]
+        else:
+            self.d2, self.dy = np.empty(len(lx)), np.empty(len(lx))
+            self.points = [(_item(self.x, i), _item(self.y, i), _item(self.total, i),
+                            _item(self.nearest, i) if nearest else None) for i in range(m)]
+
+    def intensity(self):
+        d2, dy = self.d2, self.dy
+        falloff = MODELS["clamped"]
+        if not self.by_light:
+            for x, y, total, nearest in self.points:
+                np.subtract(x, self.lx, out=d2)
+                np.subtract(y, self.ly, out=dy)
+                np.multiply(d2, d2, out=d2)
+                np.multiply(dy, dy, out=dy)
+                np.add(d2, dy, out=d2)
+                if nearest is not None:
+                    np.argmin(d2, out=nearest)
+                np.sum(falloff(d2, out=d2), out=total)
+            return
+
+        best, closer, nearest = self.best, self.closer, self.nearest
+        self.total.fill(0)
+        best.fill(np.inf)
+        for k, lx, ly in self.lights:
+            np.subtract(self.x, lx, out=d2)
+            np.subtract(self.y, ly, out=dy)
+            np.multiply(d2, d2, out=d2)
+            np.multiply(dy, dy, out=dy)
+            np.add(d2, dy, out=d2)
+            if nearest is not None:
+                np.less(d2, best, out=closer)
+                np.copyto(best, d2, where=closer)
+                np.copyto(nearest, k, where=closer)
+            self.total += falloff(d2, out=d2)
+
+
+def _item(column, i):
+    # 0-d view of column[i]
+    return column[i:i + 1].reshape(())
+
+
+# -------------------------
+# Swarm kernel: the whole step with preallocated buffers
+#
+#   Rows are grouped once per (row count, light count); light columns are
+#   copied only when the field reports a move. Love rows sum two sensors,
+#   seek rows (explorer / figure8 / orange_dash) get intensity and nearest
+#   light from the same pass. Every intermediate goes through ufunc out=
+#   buffers, so a steady tick allocates no arrays (vehicle-vehicle
+#   interactions, when on, still do). Results match the unfused path up to
+#   summation order.
+# -------------------------
+class SwarmKernel:
+    def __init__(self):
+        self.key = None
+        self.version = None
+
+    def _prepare(self, swarm, lights):
+        key = (swarm.count, len(lights))
+        if key == self.key:
+            return
+        self.key = key
+        self.version = None
+        n = swarm.count
+        behavior = swarm.behavior[:n]
+        self.lx, self.ly = np.empty(len(lights)), np.empty(len(lights))
+        self.move = np.empty(n)
+        # Views over the live rows; _grow replaces the arrays, which also
+        # changes the key
+        self.views = tuple(getattr(swarm, name)[:n] for name in COLUMNS[:5] + PREVIOUS)
+
+        # --- Love rows ---
+        self.love = np.flatnonzero(behavior == LOVE)
+        m = len(self.love)
+        for name in ("heading", "max_speed", "left", "right", "a"):
+            setattr(self, "love_" + name, np.empty(m))
+        self.love_pass = LightPass(self.lx, self.ly, m)
+        self.love_x, self.love_y = np.empty(m), np.empty(m)
+
+        # --- Seek rows ---
+        self.seek = np.flatnonzero(behavior != LOVE)
+        m = len(self.seek)
+        code = behavior[self.seek]
+        self.code = code.astype(np.intp)
+        self.explorer = code == EXPLORER
+        self.figure8 = code == FIGURE8
+        self.osc_gain = OSC_GAIN[code]
+        self.osc_rate = 2 * math.pi * OSC_FREQ[code]
+        for name in ("time", "heading", "max_speed", "speed", "a", "b"):
+            setattr(self, "seek_" + name, np.empty(m))
+        self.seek_pass = LightPass(self.lx, self.ly, m, nearest=True)
+
+    def step(self, swarm, lights, version=None):
+        # version: LightField.version, None when lights may have changed
+        self._prepare(swarm, lights)
+        if version is None or version != self.version:
+            np.copyto(self.lx, lights[:, 0])
+            np.copyto(self.ly, lights[:, 1])
+            self.version = version
+        x, y, heading, speed, time, prev_x, prev_y, prev_heading = self.views
+        np.copyto(prev_x, x)
+        np.copyto(prev_y, y)
+        np.copyto(prev_heading, heading)
+        time += 1 / swarm.fps
+
+        if len(self.love):
+            self._love(swarm)
+        if len(self.seek):
+            self._seek(swarm)
+
+        # --- Move + wrap ---
+        move = self.move
+        np.cos(heading, out=move)
+        move *= speed
+        x += move
+        np.sin(heading, out=move)
+        move *= speed
+        y += move
+        np.remainder(x, swarm.width, out=x)
+        np.remainder(y, swarm.height, out=y)
+
+    def _love(self, swarm):
+        # Two sensors, motors slow down near light
+        rows, points = self.love, self.love_pass
+        h, ms, a = self.love_heading, self.love_max_speed, self.love_a
+        np.take(swarm.x, rows, out=self.love_x, mode="clip")
+        np.take(swarm.y, rows, out=self.love_y, mode="clip")
+        np.take(swarm.heading, rows, out=h, mode="clip")
+        np.take(swarm.max_speed, rows, out=ms, mode="clip")
+        for angle, motor in ((math.pi / 4, self.love_left), (-math.pi / 4, self.love_right)):
+            np.add(h, angle, out=a)
+            np.cos(a, out=points.x)
+            points.x *= swarm.sensor_offset
+            points.x += self.love_x
+            np.sin(a, out=points.y)
+            points.y *= swarm.sensor_offset
+            points.y += self.love_y
+            points.intensity()
+            if swarm.emit_radius:
+                points.total += swarm.glow(points.x, points.y, rows)
+            np.divide(points.total, swarm.threshold, out=motor)
+            np.subtract(1, motor, out=motor)
+            motor *= ms
+            np.maximum(motor, 0, out=motor)
+
+        left, right = self.love_left, self.love_right
+        np.subtract(right, left, out=a)
+        a *= swarm.turn_gain
+        h += a
+        swarm.heading[rows] = h
+        left += right
+        left /= 2
+        swarm.speed[rows] = left
+
+    def _seek(self, swarm):
+        # Steer toward the nearest light
+        rows, points = self.seek, self.seek_pass
+        x, y = points.x, points.y
+        h, ms = self.seek_heading, self.seek_max_speed
+        total, nearest, a, b = points.total, points.nearest, self.seek_a, self.seek_b
+        np.take(swarm.x, rows, out=x, mode="clip")
+        np.take(swarm.y, rows, out=y, mode="clip")
+        np.take(swarm.time, rows, out=self.seek_time, mode="clip")
+        np.take(swarm.heading, rows, out=h, mode="clip")
+        np.take(swarm.max_speed, rows, out=ms, mode="clip")
+        points.intensity()
+        if swarm.emit_radius:
+            total += swarm.glow(x, y, rows)
+
+        # --- Speed ---
+        np.log1p(total, out=a)
+        a += 1
+        np.divide(ms, a, out=a)
+        np.divide(total, swarm.threshold, out=b)
+        np.subtract(1, b, out=b)
+        np.maximum(b, 0, out=b)
+        b *= ms
+        speed = self.seek_speed
+        np.copyto(speed, ms)
+        np.copyto(speed, a, where=self.explorer)
+        np.copyto(speed, b, where=self.figure8)
+        swarm.speed[rows] = speed
+
+        # --- Heading: oscillation, then attraction to the nearest light ---
+        np.multiply(self.osc_rate, self.seek_time, out=a)
+        np.sin(a, out=a)
+        a *= self.osc_gain
+        h += a
+        if len(self.lx):
+            np.take(self.ly, nearest, out=a, mode="clip")
+            a -= y
+            np.take(self.lx, nearest, out=b, mode="clip")
+            b -= x
+            np.arctan2(a, b, out=a)
+            a -= h
+            a += math.pi
+            np.remainder(a, 2 * math.pi, out=a)
+            a -= math.pi
+            np.take(swarm.attract_gain, self.code, out=b, mode="clip")
+            a *= b
+            h += a
+        swarm.heading[rows] = h
+
+
+# -------------------------
+# Row view (one vehicle inside a Swarm)
+# -------------------------
+def _column(name):
+    def get(self):
+        return float(getattr(self.swarm, name)[self.index])
+
+    def set(self, value):
+        getattr(self.swarm, name)[self.index] = value
+
+    return property(get, set)
+
+
+class SwarmRow:
+    x = _column("x")
+    y = _column("y")
+    heading = _column("heading")
+    speed = _column("speed")
+    time = _column("time")
+    max_speed = _column("max_speed")
+
+
+# -------------------------
+# Check: python swarm.py [ROWS] [TICKS]
+#   Swarm.step, fused and unfused, must track the per-vehicle reference
+#   (v_4.Vehicle.update, one row at a time) for every behavior while the
+#   lights move: with fewer lights than rows (the fused passes loop over
+#   lights) and with more (they loop over rows)
+# -------------------------
+if __name__ == "__main__":
+    import random
+    import sys
+    from v_4 import Vehicle
+
+    def check(rows, light_count, ticks, width=900, height=650):
+        rng = random.Random(4)
+        spawn = [(rng.uniform(0, width), rng.uniform(0, height), BEHAVIORS[i % len(BEHAVIORS)]) for i in range(rows)]
+        lights = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(light_count)]
+
+        def build(fused):
+            swarm = Swarm(width, height, fused=fused)
+            seed = random.Random(5)
+            vehicles = [Vehicle(x, y, None, behavior, swarm, seed) for x, y, behavior in spawn]
+            return swarm, vehicles
+
+        reference, vehicles = build(True)
+        swarms = {"fused": build(True)[0], "unfused": build(False)[0]}
+        field = LightField(lights, cell_size=128)
+        for tick in range(ticks):
+            if tick % 50 == 25:
+                field.move(tick % light_count, rng.uniform(0, width), rng.uniform(0, height))
+            positions = [tuple(p) for p in field.positions.tolist()]
+            for v in vehicles:
+                v.update(positions)
+            for label, swarm in swarms.items():
+                swarm.step(field)
+                for name in ("x", "y", "heading", "speed"):
+                    expected, got = getattr(reference, name)[:rows], getattr(swarm, name)[:rows]
+                    for code, behavior in enumerate(BEHAVIORS):
+                        mine = reference.behavior[:rows] == code
+                        assert np.allclose(got[mine], expected[mine]), \
+                            f"{label}, {light_count} lights, tick {tick}: {behavior} {name} differs by " \
+                            f"{np.abs(got - expected)[mine].max():.3g}"
+        kernel = swarms["fused"].kernel
+        return {kernel.love_pass.by_light, kernel.seek_pass.by_light}
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    for light_count, by_light in ((3, True), (rows + 5, False)):
+        assert check(rows, light_count, ticks) == {by_light}, f"{light_count} lights: wrong LightPass branch"
+        loop = "lights" if by_light else "rows"
+        print(f"{rows} rows, {light_count} lights x {ticks} ticks (passes loop over {loop}): "
+              f"fused and unfused Swarm.step match v_4.Vehicle.update for {', '.join(BEHAVIORS)}")
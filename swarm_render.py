@@ -0,0 +1,212 @@
+import itertools
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from lazy_pygame import pygame
+
+# Fills the sprite background; transparent through the color key
+KEY = (255, 0, 255)
+
+
+# -------------------------
+# Batched swarm drawing: every row stamped with one Surface.blits call
+#
+#   Body + heading line are pre-rendered per color and rotated once per
+#   heading bucket; a frame is then a bucket lookup on the heading array
+#   and a single blits() over (sprite, corner) pairs. Color-keyed RLE
+#   sprites blit several times faster than per-pixel alpha ones.
+# -------------------------
+class SwarmSprites:
+    def __init__(self, swarm, colors, radius=14, nose=20, nose_width=3,
+                 angle_buckets=360, max_rects=256):
+        self.swarm = swarm
+        self.radius = radius
+        self.nose = nose
+        self.nose_width = nose_width
+        self.angle_buckets = angle_buckets
+        # Above this many rows one bounding rect is reported instead of one each
+        self.max_rects = max_rects
+        self.palette = list(dict.fromkeys(colors))
+        self.code = np.array([self.palette.index(c) for c in colors], dtype=np.intp)
+        self.sprites = None
+
+    def build_body(self, color):
+        size = 2 * (self.nose + self.nose_width)
+        c = size // 2
+        surf = pygame.Surface((size, size))
+        surf.fill(KEY)
+        pygame.draw.circle(surf, color, (c, c), self.radius)
+        pygame.draw.line(surf, (0, 0, 0), (c, c), (c + self.nose, c), self.nose_width)
+        return surf
+
+    def rotations(self):
+        # sprites[color, bucket] and the offset from center to top-left corner
+        buckets = self.angle_buckets
+        sprites = np.empty((len(self.palette), buckets), dtype=object)
+        offsets = np.zeros((len(self.palette), buckets, 2), dtype=np.int64)
+        display = pygame.display.get_surface() is not None
+        for p, color in enumerate(self.palette):
+            body = self.build_body(color)
+            for b in range(buckets):
+                surf = pygame.transform.rotate(body, -b * 360 / buckets)
+                if display:
+                    surf = surf.convert()
+                surf.set_colorkey(KEY, pygame.RLEACCEL)
+                sprites[p, b] = surf
+                offsets[p, b] = (surf.get_width() // 2, surf.get_height() // 2)
+        return sprites, offsets
+
+    def _build(self):
+        self.sprites, self.offsets = self.rotations()
+
+    def _corners(self, alpha):
+        # Sprite color, bucket and top-left corner (2, n) of every row
+        n = self.swarm.count
+        if self.sprites is None:
+            self._build()
+        x, y, heading = self.swarm.interpolate(alpha)
+        bucket = np.rint(heading * (self.angle_buckets / (2 * math.pi))).astype(np.intp)
+        bucket %= self.angle_buckets
+        code = self.code[:n]
+
+        offset = self.offsets[code, bucket]
+        corner = np.empty((2, n), dtype=np.int64)
+        corner[0] = x
+        corner[1] = y
+        corner -= offset.T
+        return code, bucket, corner, offset
+
+    def draw(self, surface, alpha=1.0):
+        # Returns the rects touched (one per row, or one bounding rect)
+        n = self.swarm.count
+        if not n:
+            return []
+        code, bucket, corner, offset = self._corners(alpha)
+        left, top = corner.tolist()
+        blits = zip(self.sprites[code, bucket].tolist(), zip(left, top))
+
+        if n <= self.max_rects:
+            return surface.blits(blits)
+        surface.blits(blits, doreturn=False)
+        low = corner.min(axis=1)
+        high = (corner + 2 * offset.T).max(axis=1)
+        bounds = pygame.Rect(int(low[0]), int(low[1]), int(high[0] - low[0]), int(high[1] - low[1]))
+        return [bounds.clip(surface.get_rect())]
+
+    # --- Split drawing: submit() before the lights, finish() after ---
+    def submit(self, surface, alpha=1.0):
+        self.pending = (surface, alpha)
+
+    def finish(self):
+        # Rects touched, as from draw()
+        return self.draw(*self.pending)
+
+    def close(self):
+        pass
+
+
+# -------------------------
+# Tiled swarm drawing on a thread pool
+#
+#   submit() snapshots the poses, sorts rows into the screen tiles their
+#   sprite overlaps and hands each tile to a worker thread, which stamps
+#   it with one blits() call; pygame releases the GIL inside blits(), so
+#   tiles rasterize in parallel while the main thread draws the lights,
+#   or steps the next frame when the loop submits right after a flip.
+#   finish() waits and copies every tile's used area to the screen in one
+#   more blits(). Each thread draws its own sprite set into its own
+#   canvas only: an RLE sprite is re-encoded whenever its destination
+#   surface changes.
+# -------------------------
+class TiledSprites(SwarmSprites):
+    def __init__(self, swarm, colors, threads=4, tile=(256, 256), **options):
+        super().__init__(swarm, colors, **options)
+        self.tile = tile
+        self.pool = ThreadPoolExecutor(threads, thread_name_prefix="tiles")
+        self.local = threading.local()
+        self.jobs = []
+
+    def _canvas(self, size):
+        # This thread's sprites, screen-sized canvas and blank tile
+        local = self.local
+        if getattr(local, "size", None) != size:
+            display = pygame.display.get_surface() is not None
+            local.canvas = pygame.Surface(size)
+            local.blank = pygame.Surface(self.tile)
+            if display:
+                local.canvas = local.canvas.convert()
+                local.blank = local.blank.convert()
+            local.canvas.set_colorkey(KEY)
+            local.blank.fill(KEY)
+            local.size = size
+        if not hasattr(local, "sprites"):
+            local.sprites = self.rotations()[0]
+        return local
+
+    def _raster(self, size, tile, code, bucket, left, top):
+        # Worker thread: clear one tile of this thread's canvas and stamp it
+        local = self._canvas(size)
+        canvas = local.canvas
+        canvas.set_clip(tile)
+        sprites = zip(local.sprites[code, bucket].tolist(), zip(left, top))
+        canvas.blits(itertools.chain([(local.blank, tile.topleft)], sprites), doreturn=False)
+        return canvas
+
+    def submit(self, surface, alpha=1.0):
+        # Poses are copied here; the swarm may step before finish()
+        self.jobs = []
+        n = self.swarm.count
+        if not n:
+            return
+        code, bucket, corner, offset = self._corners(alpha)
+        low, high = corner, corner + 2 * offset.T
+        size = surface.get_size()
+        tile = np.array(self.tile)[:, None]
+        tiles = -(-np.array(size)[:, None] // tile)
+        visible = np.all((high > 0) & (low < np.array(size)[:, None]), axis=0)
+        first = np.clip(low // tile, 0, tiles - 1)
+        last = np.clip((high - 1) // tile, 0, tiles - 1)
+
+        # (tile, row) pairs; a sprite spans at most `span` tiles per axis
+        span = int((2 * self.offsets.max(axis=(0, 1)) // self.tile).max()) + 2
+        ids, rows = [], []
+        for i in range(span):
+            for j in range(span):
+                tx, ty = first[0] + i, first[1] + j
+                keep = visible & (tx <= last[0]) & (ty <= last[1])
+                ids.append((ty * tiles[0, 0] + tx)[keep])
+                rows.append(np.flatnonzero(keep))
+        ids, rows = np.concatenate(ids), np.concatenate(rows)
+        # Grouped by tile, rows in order within a tile (same overlap as draw())
+        order = np.argsort(ids * n + rows)
+        ids, rows = ids[order], rows[order]
+        starts = np.flatnonzero(np.diff(ids, prepend=-1))
+
+        for start, group in zip(starts, np.split(rows, starts[1:])):
+            t = int(ids[start])
+            tx, ty = t % tiles[0, 0], t // tiles[0, 0]
+            rect = pygame.Rect(tx * self.tile[0], ty * self.tile[1], *self.tile)
+            x0, y0 = low[:, group].min(axis=1)
+            x1, y1 = high[:, group].max(axis=1)
+            used = rect.clip(pygame.Rect(int(x0), int(y0), int(x1 - x0), int(y1 - y0))).clip(surface.get_rect())
+            job = self.pool.submit(self._raster, size, rect, code[group], bucket[group],
+                                   low[0, group].tolist(), low[1, group].tolist())
+            self.jobs.append((job, used))
+        self.surface = surface
+
+    def finish(self):
+        if not self.jobs:
+            return []
+        self.surface.blits([(job.result(), used.topleft, used) for job, used in self.jobs], doreturn=False)
+        used = [used for _, used in self.jobs]
+        self.jobs = []
+        return used
+
+    def draw(self, surface, alpha=1.0):
+        self.submit(surface, alpha)
+        return self.finish()
+
+    def close(self):
+        self.pool.shutdown()
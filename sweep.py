@@ -0,0 +1,193 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+from intensity import squared_distances
+from sim_core import SCENARIOS, Simulation
+
+# A vehicle within this many pixels of a light counts as "near" it
+NEAR_RADIUS = 60
+METRICS = ("mean_light_distance", "near_light_fraction", "path_length")
+
+
+# -------------------------
+# Models: any scenario from sim_core (v_4, v_2, v3_t, ...)
+# -------------------------
+MODELS = SCENARIOS
+
+
+# -------------------------
+# One headless run -> metrics
+# -------------------------
+def simulate(model, params, ticks, seed, overrides=None):
+    # overrides: scenario config keys set for this run (e.g. cutoff)
+    sim = Simulation(dict(MODELS[model], **(overrides or {})), random.Random(seed))
+    width, height = sim.width, sim.height
+    for name, value in params.items():
+        for target in sim.tunables():
+            if not hasattr(target, name):
+                raise ValueError(f"{model} has no tunable {name!r}")
+            current = getattr(target, name)
+            if isinstance(current, np.ndarray):
+                # Per-behavior tunables (attract_gain): every entry takes the value
+                current[...] = value
+            else:
+                setattr(target, name, value)
+
+    x, y = (a.copy() for a in sim.pose())
+    distance = np.zeros(len(x))
+    near = np.zeros(len(x))
+    path = np.zeros(len(x))
+    for _ in range(ticks):
+        sim.step()
+        nx, ny = sim.pose()
+        # Displacement across the wrap-around edges takes the short way
+        dx = (nx - x + width / 2) % width - width / 2
+        dy = (ny - y + height / 2) % height - height / 2
+        path += np.hypot(dx, dy)
+        d = np.sqrt(squared_distances(np.column_stack((nx, ny)), sim.field.positions).min(axis=1))
+        distance += d
+        near += d < NEAR_RADIUS
+        x[:], y[:] = nx, ny
+
+    return {
+        "mean_light_distance": float(distance.mean() / ticks),
+        "near_light_fraction": float(near.mean() / ticks),
+        "path_length": float(path.mean()),
+    }
+
+
+def _run_chunk(model, ticks, units, overrides=None):
+    # units: [(point, seed, params), ...]; runs in a worker process
+    rows = []
+    for point, seed, params in units:
+        row = {"point": point, "seed": seed, **params}
+        row.update(simulate(model, params, ticks, seed, overrides))
+        rows.append(row)
+    return rows
+
+
+# -------------------------
+# Parameter points
+# -------------------------
+def grid_points(spec):
+    # spec: {"threshold": [30, 50, 70], ...} -> every combination
+    names = sorted(spec)
+    return [dict(zip(names, values)) for values in itertools.product(*(spec[n] for n in names))]
+
+
+def random_points(ranges, samples, seed=0):
+    # ranges: {"threshold": (20, 80), ...} -> uniform samples, reproducible
+    rng = random.Random(seed)
+    names = sorted(ranges)
+    return [{n: rng.uniform(*ranges[n]) for n in names} for _ in range(samples)]
+
+
+def _key(params, seed):
+    return tuple(sorted((n, float(v)) for n, v in params.items())) + (int(seed),)
+
+
+def _done(out, names):
+    # Finished runs are matched on parameter values + seed, so growing a
+    # grid or adding seeds reuses everything already computed
+    if not os.path.exists(out):
+        return set()
+    with open(out, newline="") as f:
+        return {_key({n: r[n] for n in names}, r["seed"]) for r in csv.DictReader(f)}
+
+
+def run_sweep(model, points, ticks=1800, seeds=(0,), out="sweep.csv", workers=None, chunk=4, overrides=None):
+    # Resumable: runs already in `out` are skipped, and rows are appended
+    # as each chunk finishes
+    names = sorted(points[0]) if points else []
+    done = _done(out, names)
+    units = [(p, s, params) for p, params in enumerate(points) for s in seeds
+             if _key(params, s) not in done]
+    chunks = [units[i:i + chunk] for i in range(0, len(units), chunk)]
+    fields = ["point", "seed"] + names + list(METRICS)
+
+    new_file = not os.path.exists(out) or os.path.getsize(out) == 0
+    with open(out, "a", newline="") as f, ProcessPoolExecutor(workers) as pool:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        if new_file:
+            writer.writeheader()
+        futures = [pool.submit(_run_chunk, model, ticks, c, overrides) for c in chunks]
+        total = len(points) * len(seeds)
+        finished = total - len(units)
+        for future in as_completed(futures):
+            rows = future.result()
+            writer.writerows(rows)
+            f.flush()
+            finished += len(rows)
+            print(f"{finished}/{total} runs", flush=True)
+    return out
+
+
+# -------------------------
+# Check: python sweep.py --check
+#   a per-behavior array tunable swept as one value must run on every
+#   step path (fused, unfused, cutoff), and the value must take effect
+# -------------------------
+def check(model="v_4", ticks=120):
+    for overrides in ({}, {"fused": False}, {"cutoff": 200}):
+        runs = [simulate(model, {"attract_gain": gain}, ticks, 0, overrides) for gain in (0.02, 0.08)]
+        assert runs[0] != runs[1], f"{model} {overrides}: attract_gain had no effect"
+        print(f"{model} {overrides or 'fused'}: attract_gain 0.02 / 0.08 -> "
+              f"mean light distance {runs[0]['mean_light_distance']:.1f} / {runs[1]['mean_light_distance']:.1f}")
+
+
+# -------------------------
+# Command line
+# -------------------------
+def _parse_values(items):
+    spec = {}
+    for item in items:
+        name, values = item.split("=", 1)
+        spec[name] = values
+    return spec
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless parameter sweep for the Braitenberg vehicles")
+    parser.add_argument("--model", choices=sorted(MODELS), default="v_4")
+    parser.add_argument("--grid", nargs="*", default=[], metavar="NAME=V1,V2,...",
+                        help="grid values, e.g. threshold=30,50,70 turn_gain=0.03,0.05")
+    parser.add_argument("--random", nargs="*", default=[], metavar="NAME=LO:HI",
+                        help="uniform ranges for random sampling, e.g. memory_gain=0.0002:0.002")
+    parser.add_argument("--samples", type=int, default=32, help="number of random points")
+    parser.add_argument("--sample-seed", type=int, default=0)
+    parser.add_argument("--ticks", type=int, default=1800)
+    parser.add_argument("--seeds", type=int, default=1, help="repeat each point with seeds 0..N-1")
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--chunk", type=int, default=4, help="runs per worker task")
+    parser.add_argument("--out", default="sweep.csv")
+    parser.add_argument("--cutoff", type=float, default=None, help="sensor cutoff radius for every run")
+    parser.add_argument("--check", action="store_true",
+                        help="sweep attract_gain on the fused, unfused and cutoff paths, then exit")
+    args = parser.parse_args()
+    if args.check:
+        check()
+        return
+    overrides = {"cutoff": args.cutoff} if args.cutoff is not None else None
+
+    if args.random:
+        ranges = {n: tuple(float(v) for v in r.split(":")) for n, r in _parse_values(args.random).items()}
+        points = random_points(ranges, args.samples, args.sample_seed)
+    else:
+        spec = {n: [float(v) for v in vs.split(",")] for n, vs in _parse_values(args.grid).items()}
+        points = grid_points(spec)
+
+    start = time.perf_counter()
+    run_sweep(args.model, points, args.ticks, range(args.seeds), args.out, args.workers, args.chunk, overrides)
+    print(f"done in {time.perf_counter() - start:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
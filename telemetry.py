@@ -0,0 +1,272 @@
+import asyncio
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+
+import numpy as np
+
+
+# -------------------------
+# Telemetry sinks for the async loop (--telemetry)
+#
+#   A sink is called as sink(sim, stats) at the telemetry rate, between
+#   steps; it may return an awaitable. stats holds the loop counters
+#   (tick, frame, step_ms, dropped, ...).
+# -------------------------
+class JsonLinesTelemetry:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "w")
+
+    def __call__(self, sim, stats):
+        row = dict(stats, lights=sim.field.positions.tolist())
+        self.file.write(json.dumps(row) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+# -------------------------
+# Stream format (--serve)
+#
+#   Every frame is a HEADER (little endian):
+#       magic, version, kind, tick, base tick, vehicles, lights, payload bytes
+#   SCHEMA (first frame on connect): JSON {fields, quant, fps, width, height}
+#   KEYFRAME: lights f32 (lights x 2) | x, y as i32 in 1/quant px |
+#             the other fields f32, columnar (field x vehicles)
+#   DELTA:    the same, with x, y as i16 differences from tick `base`
+#
+# Positions are quantized before the difference, so deltas add up
+# exactly. A client that falls behind skips ticks and gets a keyframe.
+# -------------------------
+MAGIC = b"BRTL"
+VERSION = 1
+SCHEMA, KEYFRAME, DELTA = range(3)
+HEADER = struct.Struct("<4sBBIIIHI")
+QUANT = 16
+DELTA_LIMIT = np.iinfo(np.int16).max
+
+
+def frame(kind, tick, base, vehicles, lights, payload):
+    return HEADER.pack(MAGIC, VERSION, kind, tick, base, vehicles, lights, len(payload)) + payload
+
+
+def parse_address(address):
+    # "PORT", "HOST:PORT" or "unix:PATH"; TCP stays on localhost by default
+    address = str(address)
+    if address.startswith("unix:"):
+        return "unix", address[5:]
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+class Client:
+    def __init__(self, writer, size):
+        self.writer = writer
+        self.task = asyncio.current_task()
+        self.queue = asyncio.Queue(size)
+        self.needs_key = True
+        self.dropped = 0
+
+
+# -------------------------
+# TelemetryServer: per-tick snapshots to any number of local viewers
+#
+#   The server runs its own asyncio loop on a daemon thread. publish()
+#   (simulation thread) only copies the columns and hands them over, one
+#   snapshot at a time: while the server is still busy with the last one
+#   ticks are skipped (a headless run outpaces any socket). Frames are
+#   encoded once per tick on the server thread and queued per client. A
+#   full queue drops that client's ticks until it drains, then it resyncs
+#   from a keyframe, so a slow viewer never holds up the simulation or
+#   the other viewers. Nothing is copied without clients.
+# -------------------------
+class TelemetryServer:
+    def __init__(self, address, queue=16, key_every=300):
+        self.kind, self.address = parse_address(address)
+        self.queue = queue
+        self.key_every = key_every
+        self.clients = set()
+        self.tick = 0
+        self.last = None
+        self.pending = None
+        self.skipped = 0
+        self.ready = threading.Event()
+        self.thread = None
+        self.error = None
+
+    def start(self, sim):
+        self.fields = sim.record_fields()
+        self.rest = [name for name in self.fields if name not in ("x", "y")]
+        schema = {"fields": self.rest, "quant": QUANT, "fps": sim.fps, "width": sim.width, "height": sim.height}
+        self.schema = frame(SCHEMA, 0, 0, 0, 0, json.dumps(schema).encode())
+        self.thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def publish(self, sim):
+        # Simulation thread, once per tick
+        self.tick += 1
+        if not self.clients:
+            return
+        if self.pending is not None:
+            self.skipped += 1
+            return
+        columns = sim.columns(self.fields)
+        xy = np.array((columns["x"], columns["y"]), dtype=np.float64)
+        rest = np.array([columns[name] for name in self.rest], dtype="<f4").reshape(len(self.rest), -1)
+        lights = np.array(sim.field.positions, dtype="<f4")
+        self.pending = (self.tick, lights, xy, rest)
+        self.loop.call_soon_threadsafe(self._broadcast)
+
+    def close(self):
+        if self.thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.stopping.set)
+        self.thread.join()
+        self.thread = None
+
+    # --- Server thread ---
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except OSError as error:
+            self.error = error
+            self.ready.set()
+
+    async def _serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        if self.kind == "unix":
+            server = await asyncio.start_unix_server(self._client, self.address)
+        else:
+            server = await asyncio.start_server(self._client, *self.address)
+            # Port 0 picks a free one
+            self.address = server.sockets[0].getsockname()[:2]
+        self.ready.set()
+        async with server:
+            await self.stopping.wait()
+            tasks = [client.task for client in self.clients]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if self.kind == "unix":
+            os.unlink(self.address)
+
+    async def _client(self, reader, writer):
+        client = Client(writer, self.queue)
+        self.clients.add(client)
+        try:
+            writer.write(self.schema)
+            while True:
+                writer.write(await client.queue.get())
+                # Backpressure: a slow socket stalls this writer only
+                await writer.drain()
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            # Viewer gone, or the server stopping
+            pass
+        finally:
+            self.clients.discard(client)
+            writer.close()
+
+    def _broadcast(self):
+        (tick, lights, xy, rest), self.pending = self.pending, None
+        q = np.rint(xy * QUANT).astype("<i4")
+        last, self.last = self.last, (tick, q)
+        head = lights.tobytes()
+        tail = rest.tobytes()
+        n, m = q.shape[1], len(lights)
+
+        delta = key = None
+        if last is not None and last[0] == tick - 1 and last[1].shape == q.shape and tick % self.key_every:
+            d = q - last[1]
+            if not d.size or np.abs(d).max() <= DELTA_LIMIT:
+                delta = frame(DELTA, tick, tick - 1, n, m, head + d.astype("<i2").tobytes() + tail)
+
+        for client in list(self.clients):
+            if client.queue.full():
+                client.dropped += 1
+                client.needs_key = True
+                continue
+            if client.needs_key or delta is None:
+                if key is None:
+                    key = frame(KEYFRAME, tick, tick, n, m, head + q.tobytes() + tail)
+                client.queue.put_nowait(key)
+                client.needs_key = False
+            else:
+                client.queue.put_nowait(delta)
+
+
+# -------------------------
+# Client side: decode a stream back into arrays
+# -------------------------
+class FrameDecoder:
+    def __init__(self):
+        self.schema = None
+        self.tick = None
+        self.q = None
+
+    def decode(self, header, payload):
+        # Returns {"tick", "lights", "x", "y", <fields>} or None (schema,
+        # or a delta whose base tick is not the last one decoded)
+        magic, version, kind, tick, base, n, m, _ = header
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a telemetry stream")
+        if kind == SCHEMA:
+            self.schema = json.loads(payload)
+            return None
+        lights = np.frombuffer(payload, "<f4", 2 * m).reshape(m, 2)
+        offset = 8 * m
+        if kind == KEYFRAME:
+            self.q = np.frombuffer(payload, "<i4", 2 * n, offset).reshape(2, n)
+            offset += 8 * n
+        else:
+            if self.q is None or base != self.tick:
+                return None
+            self.q = self.q + np.frombuffer(payload, "<i2", 2 * n, offset).reshape(2, n)
+            offset += 4 * n
+        self.tick = tick
+        fields = self.schema["fields"]
+        rest = np.frombuffer(payload, "<f4", len(fields) * n, offset).reshape(len(fields), n)
+        snapshot = {"tick": tick, "lights": lights, "x": self.q[0] / QUANT, "y": self.q[1] / QUANT}
+        snapshot.update(zip(fields, rest))
+        return snapshot
+
+
+def connect(address):
+    kind, address = parse_address(address)
+    if kind == "unix":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.connect(address)
+    return sock
+
+
+def snapshots(sock):
+    # Decoded snapshots from a connected socket, until it closes
+    stream = sock.makefile("rb")
+    decoder = FrameDecoder()
+    while True:
+        raw = stream.read(HEADER.size)
+        if len(raw) < HEADER.size:
+            return
+        header = HEADER.unpack(raw)
+        payload = stream.read(header[-1])
+        snapshot = decoder.decode(header, payload)
+        if snapshot is not None:
+            yield snapshot
+
+
+if __name__ == "__main__":
+    # python telemetry.py ADDRESS: one summary line per tick
+    for snap in snapshots(connect(sys.argv[1])):
+        speed = snap.get("speed")
+        mean = float(np.mean(speed)) if speed is not None and len(speed) else 0.0
+        print(f"tick {snap['tick']}: {len(snap['x'])} vehicles, {len(snap['lights'])} lights, mean speed {mean:.3f}")
@@ -1,30 +1,25 @@
-import pygame
 import math
 import random
-
-pygame.init()
+from lazy_pygame import pygame
+from render_cache import labels
+from sim_core import Agent, register_model, run_scenario
 
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Braitenberg Vehicle 3: Memory & Internal State")
-
-clock = pygame.time.Clock()
-fps = 60
-font = pygame.font.SysFont("consolas", 16)
 
 # ==========================
 # Vehicle with Memory (Chapter 3)
 # ==========================
-class VehicleThree:
-    def __init__(self, x, y, color, cross_wired=False):
-        self.x = x
-        self.y = y
-        self.heading = random.uniform(0, 2 * math.pi)
+class VehicleThree(Agent):
+    # Body geometry (part of the sprite cache key)
+    BODY_SIZE = (120, 45)
+    STATE = Agent.STATE + ("memory",)
 
-        self.color = color
+    def __init__(self, x, y, color, cross_wired=False, rng=random, bounds=(WIDTH, HEIGHT)):
+        super().__init__(x, y, color, rng, bounds)
         self.cross_wired = cross_wired  # False = Fear, True = Aggression
 
         self.sensor_offset = 25
+        self.turn_gain = 0.006
         self.max_speed = 120
 
         # -------- Chapter 3 addition --------
@@ -33,24 +28,12 @@ class VehicleThree:
         self.memory_gain = 0.0008
         # ------------------------------------
 
-        self.speed = 0
-
-    def update(self, light_positions):
-        # Sensor positions
-        left_sensor = (
-            self.x + math.cos(self.heading + math.pi / 6) * self.sensor_offset,
-            self.y + math.sin(self.heading + math.pi / 6) * self.sensor_offset
-        )
-        right_sensor = (
-            self.x + math.cos(self.heading - math.pi / 6) * self.sensor_offset,
-            self.y + math.sin(self.heading - math.pi / 6) * self.sensor_offset
-        )
+    def sensor_points(self):
+        return self.sensors(math.pi / 6, self.sensor_offset)
 
+    def steer(self, lights, cutoff=None):
         # Light intensities
-        left_intensity, right_intensity = 0, 0
-        for lx, ly in light_positions:
-            left_intensity += 8000 / (math.dist(left_sensor, (lx, ly))**2 + 1)
-            right_intensity += 8000 / (math.dist(right_sensor, (lx, ly))**2 + 1)
+        left_intensity, right_intensity = self.sense(lights, cutoff)
 
         total_light = left_intensity + right_intensity
 
@@ -69,92 +52,46 @@ class VehicleThree:
             right_motor = right_intensity
 
         # Memory affects turning strength
-        turn_rate = (right_motor - left_motor) * 0.006 * self.memory
+        turn_rate = (right_motor - left_motor) * self.turn_gain * self.memory
         self.heading += turn_rate
 
         # Memory affects speed
         base_speed = 1.5
         self.speed = min((left_motor + right_motor) * 0.04 * self.memory + base_speed, self.max_speed)
 
-        self.x += math.cos(self.heading) * self.speed
-        self.y += math.sin(self.heading) * self.speed
+    def sprite_key(self):
+        return (self.color, self.BODY_SIZE)
 
-        self.x %= WIDTH
-        self.y %= HEIGHT
-
-    def draw(self, surface):
-        body = pygame.Surface((120, 45), pygame.SRCALPHA)
-        pygame.draw.rect(body, self.color, (0, 0, 120, 45))
-        pygame.draw.rect(body, (0, 0, 0), (0, 0, 120, 45), 3)
+    def build_body(self):
+        width, height = self.BODY_SIZE
+        body = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.rect(body, self.color, (0, 0, width, height))
+        pygame.draw.rect(body, (0, 0, 0), (0, 0, width, height), 3)
 
         pygame.draw.circle(body, (255, 0, 0), (80, 10), 5)
         pygame.draw.circle(body, (0, 255, 0), (80, 35), 5)
+        return body
 
-        rotated = pygame.transform.rotate(body, -math.degrees(self.heading))
-        rect = rotated.get_rect(center=(self.x, self.y))
-        surface.blit(rotated, rect)
-
-        # Debug (shows memory = internal state)
-        surface.blit(
-            font.render(f"Memory={round(self.memory, 2)}", True, (0, 0, 0)),
-            (int(self.x - 40), int(self.y - 40))
+    def draw_info(self, surface, x, y):
+        # Debug (shows memory = internal state), follows the drawn body
+        label = labels().blit_glyphs(
+            surface, f"Memory={round(self.memory, 2)}", (0, 0, 0),
+            (int(x - 40), int(y - 40))
         )
+        return [label]
 
 # ==========================
-# Light
+# Models: 3a (fear + memory) and 3b (aggression + memory)
 # ==========================
-class Light:
-    def __init__(self, x, y, radius=15):
-        self.x = x
-        self.y = y
-        self.radius = radius
-
-    def pos(self):
-        return (self.x, self.y)
-
-    def draw(self, surface):
-        pygame.draw.circle(surface, (255, 255, 0), (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(surface, (0, 0, 0), (int(self.x), int(self.y)), self.radius, 2)
-
-# ==========================
-# Setup
-# ==========================
-lights = [
-    Light(WIDTH // 2, HEIGHT // 3),
-    Light(WIDTH // 2, HEIGHT * 2 // 3),
-]
-
-vehicle_fear = VehicleThree(350, 300, (0, 120, 255), cross_wired=False)
-vehicle_aggr = VehicleThree(550, 300, (255, 120, 0), cross_wired=True)
-
-# ==========================
-# Main Loop
-# ==========================
-running = True
-while running:
-    screen.fill((255, 255, 255))
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            lights[0].x, lights[0].y = event.pos
-
-    for light in lights:
-        light.draw(screen)
-
-    positions = [l.pos() for l in lights]
-    vehicle_fear.update(positions)
-    vehicle_aggr.update(positions)
+@register_model("memory_fear")
+def memory_fear(sim, x, y, color):
+    return VehicleThree(x, y, color, cross_wired=False, rng=sim.rng, bounds=(sim.width, sim.height))
 
-    vehicle_fear.draw(screen)
-    vehicle_aggr.draw(screen)
 
-    screen.blit(font.render("Vehicle 3a: Fear + Memory", True, (0, 0, 150)), (20, 20))
-    screen.blit(font.render("Vehicle 3b: Aggression + Memory", True, (150, 0, 0)), (20, 40))
-    screen.blit(font.render("Click to move light", True, (0, 0, 0)), (20, HEIGHT - 30))
+@register_model("memory_aggression")
+def memory_aggression(sim, x, y, color):
+    return VehicleThree(x, y, color, cross_wired=True, rng=sim.rng, bounds=(sim.width, sim.height))
 
-    pygame.display.flip()
-    clock.tick(fps)
 
-pygame.quit()
+if __name__ == "__main__":
+    run_scenario("v3_t")
@@ -1,53 +1,43 @@
-import pygame
 import math
 import random
-
-pygame.init()
+from lazy_pygame import pygame
+from render_cache import labels
+from sim_core import Agent, light_points, register_model, run_scenario
 
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Braitenberg Vehicles – Love and Fear Explorer")
-
-clock = pygame.time.Clock()
-fps = 60
-font = pygame.font.SysFont("consolas", 16)
 
 # -------------------------
 # Vehicle Class
 # -------------------------
-class Vehicle:
-    def __init__(self, x, y, color, explorer=False):
-        self.x = x
-        self.y = y
-        self.heading = random.uniform(0, 2 * math.pi)
-        self.color = color
+class Vehicle(Agent):
+    STATE = Agent.STATE + ("stopped",)
+
+    def __init__(self, x, y, color, explorer=None, rng=random, bounds=(WIDTH, HEIGHT)):
+        # explorer: None (love), "fear" (turns away from close lights),
+        # "wander" (jitters near lights) or "approach" (slows toward light)
+        super().__init__(x, y, color, rng, bounds)
         self.explorer = explorer
         self.max_speed = 4 if not explorer else 2
         self.min_speed = 0 if not explorer else 0.5
         self.sensor_offset = 25
-        self.speed = 0
         self.stopped = False
 
-    def update(self, light_positions):
+    def sensor_points(self):
+        # Love and approach steer by their two sensors; the others by distance
+        if self.explorer in (None, "approach"):
+            return self.sensors(math.pi / 6, self.sensor_offset)
+        return []
+
+    def steer(self, lights, cutoff=None):
         # Find the nearest light
-        closest_light = min(light_positions, key=lambda l: math.dist((self.x, self.y), l))
+        closest_light = min(light_points(lights), key=lambda l: math.dist((self.x, self.y), l))
         dx = closest_light[0] - self.x
         dy = closest_light[1] - self.y
         distance = math.hypot(dx, dy)
 
         if not self.explorer:
             # Blue Love vehicle: approach lights and stop near them
-            left_sensor = (
-                self.x + math.cos(self.heading + math.pi/6) * self.sensor_offset,
-                self.y + math.sin(self.heading + math.pi/6) * self.sensor_offset
-            )
-            right_sensor = (
-                self.x + math.cos(self.heading - math.pi/6) * self.sensor_offset,
-                self.y + math.sin(self.heading - math.pi/6) * self.sensor_offset
-            )
-
-            left_intensity = sum(8000 / (math.dist(left_sensor, (lx, ly))**2 + 1) for lx, ly in light_positions)
-            right_intensity = sum(8000 / (math.dist(right_sensor, (lx, ly))**2 + 1) for lx, ly in light_positions)
+            left_intensity, right_intensity = self.sense(lights, cutoff)
 
             left_motor = max(0, self.max_speed - left_intensity*0.05)
             right_motor = max(0, self.max_speed - right_intensity*0.05)
@@ -63,6 +53,21 @@ class Vehicle:
             else:
                 self.speed = speed
                 self.stopped = False
+        elif self.explorer == "wander":
+            # Move continuously, wander a little around close lights
+            self.speed = self.max_speed
+            self.stopped = False
+            if distance < 80:
+                self.heading += self.rng.uniform(-0.05, 0.05)
+        elif self.explorer == "approach":
+            # Slow approach with slight wandering
+            left_intensity, right_intensity = self.sense(lights, cutoff)
+            left_motor = max(self.min_speed, self.max_speed - left_intensity*0.02)
+            right_motor = max(self.min_speed, self.max_speed - right_intensity*0.02)
+            self.heading += self.rng.uniform(-0.02, 0.02)
+            self.heading += (right_motor - left_motor) * 0.05
+            self.speed = (left_motor + right_motor) / 2
+            self.stopped = False
         else:
             # Green Explorer: Fear behavior
             self.speed = self.max_speed
@@ -73,99 +78,44 @@ class Vehicle:
                 # Turn away from light
                 self.heading += 0.1 * (math.pi + angle_to_light - self.heading)
                 # Add slight random wandering
-                self.heading += random.uniform(-0.02, 0.02)
-
-        # Move vehicle
-        self.x += math.cos(self.heading) * self.speed
-        self.y += math.sin(self.heading) * self.speed
-
-        # Screen wrap
-        self.x %= WIDTH
-        self.y %= HEIGHT
+                self.heading += self.rng.uniform(-0.02, 0.02)
 
-    def draw(self, surface):
+    def draw_body(self, surface, x, y, heading):
         radius = 15
         color = (150, 150, 255) if self.stopped else self.color
-        pygame.draw.circle(surface, color, (int(self.x), int(self.y)), radius)
+        body = pygame.draw.circle(surface, color, (int(x), int(y)), radius)
         # heading line
-        end_x = self.x + math.cos(self.heading) * radius * 1.5
-        end_y = self.y + math.sin(self.heading) * radius * 1.5
-        pygame.draw.line(surface, (0,0,0), (self.x, self.y), (end_x, end_y), 3)
-        surface.blit(font.render(f"{round(self.speed,1)}", True, (0,0,0)), (self.x+10, self.y-10))
+        end_x = x + math.cos(heading) * radius * 1.5
+        end_y = y + math.sin(heading) * radius * 1.5
+        nose = pygame.draw.line(surface, (0,0,0), (x, y), (end_x, end_y), 3)
+        return body.union(nose)
 
-
-# -------------------------
-# Light Class
-# -------------------------
-class Light:
-    def __init__(self, x, y, radius=15):
-        self.x = x
-        self.y = y
-        self.radius = radius
-        self.dragging = False
-
-    def pos(self):
-        return (self.x, self.y)
-
-    def handle_event(self, event):
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if math.dist(event.pos, (self.x, self.y)) < self.radius:
-                self.dragging = True
-        if event.type == pygame.MOUSEBUTTONUP:
-            self.dragging = False
-        if event.type == pygame.MOUSEMOTION and self.dragging:
-            self.x, self.y = event.pos
-
-    def draw(self, surface):
-        pygame.draw.circle(surface, (255,255,0), (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(surface, (0,0,0), (int(self.x), int(self.y)), self.radius, 2)
+    def draw_info(self, surface, x, y):
+        return [labels().blit_glyphs(surface, f"{round(self.speed,1)}", (0,0,0), (int(x) + 10, int(y) - 10))]
 
 
 # -------------------------
-# Setup
+# Models: blue love (stops at lights) and the green explorers
 # -------------------------
-lights = [
-    Light(WIDTH//3, HEIGHT//3),
-    Light(WIDTH*2//3, HEIGHT*2//3)
-]
-
-love_vehicle = Vehicle(200, 300, (0,100,255), explorer=False)   # Blue, Love
-explorer_vehicle = Vehicle(400, 300, (0,200,0), explorer=True)  # Green, Fear Explorer
+@register_model("love_stop")
+def love_stop(sim, x, y, color):
+    return Vehicle(x, y, color, rng=sim.rng, bounds=(sim.width, sim.height))
 
-vehicles = [love_vehicle, explorer_vehicle]
-
-
-# -------------------------
-# Main Loop
-# -------------------------
-running = True
-while running:
-    screen.fill((255,255,255))
 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type in [pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP]:
-            for light in lights:
-                light.handle_event(event)
+@register_model("fear_explorer")
+def fear_explorer(sim, x, y, color):
+    return Vehicle(x, y, color, explorer="fear", rng=sim.rng, bounds=(sim.width, sim.height))
 
-    # Draw lights
-    for light in lights:
-        light.draw(screen)
 
-    light_positions = [l.pos() for l in lights]
+@register_model("wander_explorer")
+def wander_explorer(sim, x, y, color):
+    return Vehicle(x, y, color, explorer="wander", rng=sim.rng, bounds=(sim.width, sim.height))
 
-    # Update and draw vehicles
-    for v in vehicles:
-        v.update(light_positions)
-        v.draw(screen)
 
-    # Labels
-    screen.blit(font.render("Blue: Love Vehicle (Stops near light)", True, (0,0,0)), (10, 10))
-    screen.blit(font.render("Green: Fear Explorer (Moves away from lights)", True, (0,0,0)), (10, 30))
-    screen.blit(font.render("Click/drag to move the nearest light", True, (0,0,0)), (10, HEIGHT-25))
+@register_model("approach_explorer")
+def approach_explorer(sim, x, y, color):
+    return Vehicle(x, y, color, explorer="approach", rng=sim.rng, bounds=(sim.width, sim.height))
 
-    pygame.display.flip()
-    clock.tick(fps)
 
-pygame.quit()
+if __name__ == "__main__":
+    run_scenario("v_3")
@@ -1,33 +1,23 @@
-import pygame
 import math
 import random
 import numpy as np
-
-pygame.init()
-
-WIDTH, HEIGHT = 900, 650
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Braitenberg Vehicles – Multiple Agents")
-
-clock = pygame.time.Clock()
-fps = 60
-font = pygame.font.SysFont("consolas", 16)
+from lazy_pygame import pygame
+from swarm import BEHAVIORS, SwarmRow
+from intensity import light_intensity
+from sim_core import register_model, run_scenario
 
 # -------------------------
-# Vehicle Class
+# Vehicle Class (view over one swarm row)
 # -------------------------
-class Vehicle:
-    def __init__(self, x, y, color, behavior):
-        self.x = x
-        self.y = y
-        self.heading = random.uniform(0, 2 * math.pi)
+class Vehicle(SwarmRow):
+    def __init__(self, x, y, color, behavior, swarm, rng=random):
+        self.swarm = swarm
         self.color = color
         self.behavior = behavior
-        self.sensor_offset = 20
-        self.time = random.random() * 10
-
-        self.max_speed = 6 if behavior != "explorer" else 4
-        self.speed = 0
+        self.sensor_offset = swarm.sensor_offset
+        heading = rng.uniform(0, 2 * math.pi)
+        time = rng.random() * 10
+        self.index = swarm.add(x, y, heading, behavior, time)
 
     def sensor_position(self, side):
         angle = math.pi / 4 if side == "left" else -math.pi / 4
@@ -37,14 +27,10 @@ class Vehicle:
         )
 
     def sensor_value(self, sx, sy, lights):
-        intensity = 0
-        for lx, ly in lights:
-            d = max(1, math.dist((sx, sy), (lx, ly)))
-            intensity += 5000 / (d ** 2)
-        return intensity
+        return light_intensity((sx, sy), lights)[0]
 
     def update(self, light_positions):
-        self.time += 1 / fps
+        self.time += 1 / self.swarm.fps
 
         lx, ly = self.sensor_position("left")
         rx, ry = self.sensor_position("right")
@@ -58,8 +44,7 @@ class Vehicle:
             right_motor = max(0, self.max_speed * (1 - right_sensor / threshold))
 
         elif self.behavior == "explorer":
-            total = sum(5000 / max(1, math.dist((self.x, self.y), l)) ** 2
-                        for l in light_positions)
+            total = light_intensity((self.x, self.y), light_positions)[0]
             self.speed = self.max_speed / (1 + np.log1p(total))
 
             target = min(light_positions,
@@ -71,8 +56,7 @@ class Vehicle:
 
         elif self.behavior == "figure8":
 
-            total = sum(5000 / max(1, math.dist((self.x, self.y), l)) ** 2
-                        for l in light_positions)
+            total = light_intensity((self.x, self.y), light_positions)[0]
             threshold = 50
             self.speed = self.max_speed * max(0, 1 - total / threshold)
 
@@ -110,102 +94,31 @@ class Vehicle:
 
         self.x += math.cos(self.heading) * self.speed
         self.y += math.sin(self.heading) * self.speed
-        self.x %= WIDTH
-        self.y %= HEIGHT
-
-    def draw(self):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), 14)
-        hx = self.x + math.cos(self.heading) * 20
-        hy = self.y + math.sin(self.heading) * 20
-        pygame.draw.line(screen, (0, 0, 0), (self.x, self.y), (hx, hy), 3)
-
-# -------------------------
-# Light Class (DRAGGABLE)
-# -------------------------
-class Light:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.radius = 15
-        self.dragging = False
-
-    def pos(self):
-        return (self.x, self.y)
-
-    def handle_event(self, event):
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if math.dist(event.pos, (self.x, self.y)) < self.radius:
-                self.dragging = True
-
-        if event.type == pygame.MOUSEBUTTONUP:
-            self.dragging = False
-
-        if event.type == pygame.MOUSEMOTION and self.dragging:
-            self.x, self.y = event.pos
-
-    def draw(self):
-        pygame.draw.circle(screen, (255, 255, 0), (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(screen, (0, 0, 0), (int(self.x), int(self.y)), self.radius, 2)
+        self.x %= self.swarm.width
+        self.y %= self.swarm.height
+
+    def draw(self, surface, alpha=1.0):
+        # alpha interpolates between the last two physics steps
+        x, y, heading = self.swarm.pose(self.index, alpha)
+        body = pygame.draw.circle(surface, self.color, (int(x), int(y)), 14)
+        hx = x + math.cos(heading) * 20
+        hy = y + math.sin(heading) * 20
+        nose = pygame.draw.line(surface, (0, 0, 0), (x, y), (hx, hy), 3)
+        return body.union(nose)
 
 # -------------------------
-# CREATE MULTIPLE AGENTS
+# Models: one per behavior, all rows of the simulation's shared swarm
 # -------------------------
-NUM_EACH = 3
-
-vehicles = []
-
-for _ in range(NUM_EACH):
-    vehicles.append(Vehicle(random.randint(100, 800), random.randint(100, 500),
-                             (0, 100, 255), "love"))
-
-for _ in range(NUM_EACH):
-    vehicles.append(Vehicle(random.randint(100, 800), random.randint(100, 500),
-                             (0, 200, 0), "explorer"))
-
-for _ in range(NUM_EACH):
-    vehicles.append(Vehicle(random.randint(100, 800), random.randint(100, 500),
-                             (200, 0, 200), "figure8"))
-    
-for _ in range(NUM_EACH):
-    vehicles.append(Vehicle(random.randint(100, 800), random.randint(100, 500),
-                             (255, 165, 0), "orange_dash"))  # Orange color
-
-
-lights = [
-    Light(200, 150),
-    Light(450, 150),
-    Light(700, 150),
-    Light(300, 450),
-    Light(600, 450)
-]
-
-# -------------------------
-# MAIN LOOP
-# -------------------------
-running = True
-while running:
-    screen.fill((255, 255, 255))
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        for l in lights:
-            l.handle_event(event)
-
-    for l in lights:
-        l.draw()
-
-    light_positions = [l.pos() for l in lights]
+def swarm_model(behavior):
+    @register_model(behavior)
+    def factory(sim, x, y, color):
+        return Vehicle(x, y, color, behavior, sim.shared_swarm(), sim.rng)
+    return factory
 
-    for v in vehicles:
-        v.update(light_positions)
-        v.draw()
-    screen.blit(font.render("Orange: Dash (max speed + oscillation + nearest-light attraction)", True, (0,0,0)), (10,50))
 
-    screen.blit(font.render("Blue: Love | Green: Explorer | Purple: Figure-8", True, (0, 0, 0)), (10, 10))
-    screen.blit(font.render("Drag lights with mouse", True, (0, 0, 0)), (10, 30))
+for name in BEHAVIORS:
+    swarm_model(name)
 
-    pygame.display.flip()
-    clock.tick(fps)
 
-pygame.quit()
+if __name__ == "__main__":
+    run_scenario("v_4")